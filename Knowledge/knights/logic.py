@@ -1,3 +1,4 @@
+import heapq
 import itertools
 
 
@@ -225,8 +226,33 @@ class Biconditional(Sentence):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
+# How model_check decides entailment: "sat" or "enumerate"
+BACKEND = "sat"
+
+
+def model_check(knowledge, query, backend=None):
     """Checks if knowledge base entails query."""
+    backend = backend or BACKEND
+    if backend == "sat":
+        return model_check_sat(knowledge, query)
+    elif backend == "enumerate":
+        return model_check_enumerate(knowledge, query)
+    raise ValueError(f"unknown backend: {backend}")
+
+
+def model_check_sat(knowledge, query):
+    """
+    Checks if knowledge base entails query, which holds exactly
+    when knowledge together with the negated query is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return not cnf.solver.solve()
+
+
+def model_check_enumerate(knowledge, query):
+    """Checks if knowledge base entails query by enumerating every model."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +287,435 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+class Entailment():
+    """
+    Answers many entailment queries against one knowledge base.
+
+    With the "sat" backend the knowledge is compiled to clauses once,
+    and each query is solved under the assumption that it is false,
+    so clauses learned for one query speed up the next. With the
+    "enumerate" backend the models of the knowledge are listed once
+    and every query is tested against them.
+    """
+
+    def __init__(self, knowledge=None, backend=None):
+        self.backend = backend or BACKEND
+        if self.backend not in ("sat", "enumerate"):
+            raise ValueError(f"unknown backend: {self.backend}")
+        self.knowledge = And()
+        self.cnf = CNF()
+        self.models = None
+        if knowledge is not None:
+            self.add(knowledge)
+
+    def add(self, sentence):
+        """Adds sentence to the knowledge base."""
+        self.knowledge.add(sentence)
+        if self.backend == "sat":
+            self.cnf.add(sentence)
+        else:
+            self.models = None
+
+    def entails(self, query):
+        """Checks if knowledge base entails query."""
+        return self.check([query])[0]
+
+    def check(self, queries):
+        """
+        Returns a list telling, for each query in turn,
+        whether the knowledge base entails it.
+        """
+        queries = list(queries)
+        if self.backend == "enumerate":
+            return [self.entails_enumerate(query) for query in queries]
+
+        solver = self.cnf.solver
+        literals = [self.cnf.literal(query) for query in queries]
+        entailed = [None] * len(queries)
+        pending = list(range(len(queries)))
+
+        # Any model found shows every query false in it is not entailed,
+        # so each solve settles at least one query and usually several
+        while pending:
+            i = pending.pop()
+            if entailed[i] is not None:
+                continue
+            if not solver.solve([-literals[i]]):
+                entailed[i] = True
+                continue
+            model = solver.model
+            for j in [i] + pending:
+                if model[abs(literals[j])] != (literals[j] > 0):
+                    entailed[j] = False
+        return entailed
+
+    def entails_enumerate(self, query):
+        """Checks if every model of the knowledge base satisfies query."""
+        if self.models is None:
+            self.models = []
+            symbols = sorted(self.knowledge.symbols()) if self.knowledge.conjuncts else []
+            for values in itertools.product((True, False), repeat=len(symbols)):
+                model = dict(zip(symbols, values))
+                if self.knowledge.evaluate(model):
+                    self.models.append(model)
+
+        # Symbols the knowledge does not mention may take either value
+        extra = sorted(query.symbols() - (self.models[0].keys() if self.models else set()))
+        for model in self.models:
+            for values in itertools.product((True, False), repeat=len(extra)):
+                if not query.evaluate({**model, **dict(zip(extra, values))}):
+                    return False
+        return True
+
+
+class CNF():
+    """
+    Converts sentences to clauses in conjunctive normal form with the
+    Tseitin encoding and feeds them to a Solver. Every compound
+    subsentence gets a fresh variable standing for its truth value,
+    so the clauses grow linearly with the sentences instead of
+    exponentially. Symbols are numbered in variables by name.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = solver or Solver()
+        self.variables = {}
+        self.literals = {}
+
+    def variable(self, name):
+        """Returns the variable of the symbol with this name."""
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_variable()
+        return self.variables[name]
+
+    def add(self, sentence):
+        """Adds clauses requiring sentence to be true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.solver.add_clause([self.literal(disjunct) for disjunct in sentence.disjuncts])
+        else:
+            self.solver.add_clause([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns a literal that is true exactly when sentence is."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+
+        # Identical subsentences share one variable
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        add_clause = self.solver.add_clause
+        g = self.solver.new_variable()
+        if isinstance(sentence, And):
+            parts = [self.literal(conjunct) for conjunct in sentence.conjuncts]
+            for part in parts:
+                add_clause([-g, part])
+            add_clause([g] + [-part for part in parts])
+        elif isinstance(sentence, Or):
+            parts = [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            for part in parts:
+                add_clause([g, -part])
+            add_clause([-g] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            add_clause([-g, -a, b])
+            add_clause([g, a])
+            add_clause([g, -b])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            add_clause([-g, -a, b])
+            add_clause([-g, a, -b])
+            add_clause([g, a, b])
+            add_clause([g, -a, -b])
+        else:
+            raise TypeError(f"cannot convert {sentence!r} to clauses")
+
+        self.literals[sentence] = g
+        return g
+
+
+class Solver():
+    """
+    Conflict-driven clause learning SAT solver. Variables are numbered
+    from 1 and a literal is v (v is true) or -v (v is false).
+
+    Each clause watches two of its literals and is only looked at when
+    one of them becomes false. A conflict is analyzed back to its first
+    unique implication point, the learned clause is kept and the search
+    jumps back to the level where that clause becomes unit. Variables
+    in recent conflicts are branched on first, with the value they last
+    had, taken from a heap ordered by activity, and the search restarts
+    now and then. Learned clauses are kept
+    between calls to solve, which may assume extra literals.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.clauses = []
+        self.learned = []
+        self.watches = {}
+        self.values = [None]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+        self.heap = []
+        self.trail = []
+        self.limits = []
+        self.head = 0
+        self.increment = 1.0
+        self.ok = True
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+
+    def new_variable(self):
+        """Returns a new variable."""
+        self.count += 1
+        self.values.append(None)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        heapq.heappush(self.heap, (-0.0, self.count))
+        self.watches[self.count] = []
+        self.watches[-self.count] = []
+        return self.count
+
+    def value(self, literal):
+        """Returns True or False if literal is assigned, else None."""
+        value = self.values[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause (a list of literals, at least one of which must
+        be true). Returns False once the clauses are unsatisfiable.
+        """
+        self.backtrack(0)
+        clause = []
+        for literal in dict.fromkeys(literals):
+            while abs(literal) > self.count:
+                self.new_variable()
+            value = self.value(literal)
+            if value is True or -literal in clause:
+                return self.ok
+            if value is None:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.ok = False
+        else:
+            self.clauses.append(clause)
+            self.watch(clause)
+        return self.ok
+
+    def watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = literal > 0
+        self.levels[variable] = len(self.limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by unit clauses. Returns a
+        clause with all literals false if there is a conflict.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false]
+            self.watches[false] = kept = []
+            for i, clause in enumerate(watching):
+                # Keep the literal that just became false in clause[1]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                if self.value(first) is True:
+                    kept.append(clause)
+                    continue
+
+                # Watch some other literal that is not false, if any
+                for k in range(2, len(clause)):
+                    if self.value(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.value(first) is False:
+                        kept.extend(watching[i + 1:])
+                        self.head = len(self.trail)
+                        return clause
+                    self.assign(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from a conflict and the
+        level to jump back to.
+        """
+        level = len(self.limits)
+        learned = [None]
+        seen = set()
+        pending = 0
+        index = len(self.trail) - 1
+        literal = None
+        clause = conflict
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # Step back along the trail to the next literal involved
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            clause = self.reasons[abs(literal)]
+            pending -= 1
+            if pending == 0:
+                break
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal assigned last after the asserting one
+        deepest = max(range(1, len(learned)), key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.rebuild()
+        else:
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+
+    def rebuild(self):
+        """Rebuild the heap from the unassigned variables alone."""
+        self.heap = [
+            (-self.activity[variable], variable)
+            for variable in range(1, self.count + 1) if self.values[variable] is None
+        ]
+        heapq.heapify(self.heap)
+
+    def backtrack(self, level):
+        """Undo every assignment made above level."""
+        if len(self.limits) <= level:
+            return
+        start = self.limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = literal > 0
+            self.values[variable] = None
+            self.reasons[variable] = None
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.limits[level:]
+        self.head = start
+
+    def pick(self):
+        """Returns the unassigned variable with most activity, or None."""
+        # Entries are left behind when a variable is bumped or assigned,
+        # and skipped here; unassigning a variable pushes it again
+        if len(self.heap) > 4 * self.count + 100:
+            self.rebuild()
+        while self.heap:
+            activity, variable = heapq.heappop(self.heap)
+            if self.values[variable] is None and -activity == self.activity[variable]:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses, together with the assumed literals,
+        can all be satisfied; the satisfying assignment is then kept in
+        model, mapping each variable to True or False.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        for literal in assumptions:
+            while abs(literal) > self.count:
+                self.new_variable()
+
+        restart = 100
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.limits:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.learned.append(learned)
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= 0.95
+                continue
+
+            if conflicts >= restart:
+                conflicts = 0
+                restart = int(restart * 1.5)
+                self.backtrack(0)
+                continue
+
+            # Assumptions are decided first, one level each
+            level = len(self.limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value is False:
+                    self.backtrack(0)
+                    return False
+                self.limits.append(len(self.trail))
+                if value is None:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.pick()
+            if variable is None:
+                self.model = {v: self.values[v] for v in range(1, self.count + 1)}
+                self.backtrack(0)
+                return True
+            self.decisions += 1
+            self.limits.append(len(self.trail))
+            self.assign(variable if self.phase[variable] else -variable, None)
@@ -2,6 +2,7 @@ import pygame
 import sys
 import time
 
+from background import MoveService
 from minesweeper import Minesweeper, MinesweeperAI
 
 HEIGHT = 8
@@ -41,6 +42,28 @@ mine = pygame.transform.scale(mine, (cell_size, cell_size))
 game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
 ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
 
+# AI moves are chosen on a background thread so the window stays live
+service = MoveService()
+
+
+def choose_move(ai, progress):
+    """
+    Returns (move, safe) for the AI: a known safe cell if there is
+    one, otherwise a random cell not known to be a mine, or None.
+    """
+    # Progress counts the cells examined to pick the move
+    move = ai.make_safe_move()
+    progress.nodes = len(ai.safes)
+    if move is not None:
+        progress.best = move
+        return move, True
+    progress.check()
+    move = ai.make_random_move()
+    progress.nodes += ai.height * ai.width
+    progress.best = move
+    return move, False
+
+
 # Keep track of revealed cells, flagged cells, and if a mine was hit
 revealed = set()
 flags = set()
@@ -154,6 +177,11 @@ while True:
 
     # Display text
     text = "Lost" if lost else "Won" if game.mines == flags else ""
+    if service.busy():
+        text = "Thinking..."
+        progress = service.status()
+        if progress is not None and progress.nodes:
+            text = f"{progress.nodes} cells, best {progress.best}"
     text = mediumFont.render(text, True, WHITE)
     textRect = text.get_rect()
     textRect.center = ((5 / 6) * width, (2 / 3) * height)
@@ -178,22 +206,15 @@ while True:
     elif left == 1:
         mouse = pygame.mouse.get_pos()
 
-        # If AI button clicked, make an AI move
+        # If AI button clicked, start choosing an AI move
         if aiButton.collidepoint(mouse) and not lost:
-            move = ai.make_safe_move()
-            if move is None:
-                move = ai.make_random_move()
-                if move is None:
-                    flags = ai.mines.copy()
-                    print("No moves left to make.")
-                else:
-                    print("No known safe moves, AI making random move.")
-            else:
-                print("AI making safe move.")
+            if not service.busy():
+                service.start(choose_move, ai)
             time.sleep(0.2)
 
         # Reset game state
         elif resetButton.collidepoint(mouse):
+            service.cancel()
             game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
             ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
             revealed = set()
@@ -201,8 +222,8 @@ while True:
             lost = False
             continue
 
-        # User-made move
-        elif not lost:
+        # User-made move, once the AI is not using its knowledge
+        elif not lost and not service.busy():
             for i in range(HEIGHT):
                 for j in range(WIDTH):
                     if (cells[i][j].collidepoint(mouse)
@@ -210,6 +231,18 @@ while True:
                             and (i, j) not in revealed):
                         move = (i, j)
 
+    # Collect the AI's move once it has been chosen
+    done, answer = service.poll()
+    if done:
+        move, safe = answer
+        if move is None:
+            flags = ai.mines.copy()
+            print("No moves left to make.")
+        elif safe:
+            print("AI making safe move.")
+        else:
+            print("No known safe moves, AI making random move.")
+
     # Make move and update AI knowledge
     if move:
         if game.is_mine(move):
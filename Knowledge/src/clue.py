@@ -21,10 +21,14 @@ symbols = characters + rooms + weapons
 
 
 def check_knowledge(knowledge):
-    for symbol in symbols:
-        if model_check(knowledge, symbol):
+    # Ask about every symbol and its negation in one batch
+    session = Entailment(knowledge)
+    yes = session.check(symbols)
+    no = session.check([Not(symbol) for symbol in symbols])
+    for symbol, entailed, ruled_out in zip(symbols, yes, no):
+        if entailed:
             termcolor.cprint(f"{symbol}: YES", "green")
-        elif not model_check(knowledge, Not(symbol)):
+        elif not ruled_out:
             print(f"{symbol}: MAYBE")
 
 
@@ -51,6 +51,7 @@ knowledge.add(And(
     Not(Symbol("yellow3"))
 ))
 
-for symbol in symbols:
-    if model_check(knowledge, symbol):
+session = Entailment(knowledge)
+for symbol, entailed in zip(symbols, session.check(symbols)):
+    if entailed:
         print(symbol)
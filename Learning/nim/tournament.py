@@ -0,0 +1,208 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import random
+import time
+
+from nim import Nim, NimAI, train
+
+# Agents that can take part, see choose()
+AGENTS = ["q", "optimal", "random"]
+
+# Trained AI used by the "q" agent in this process
+ai = None
+
+# Solved positions for the "optimal" agent: True if the player to move wins
+solved = {}
+
+
+def wins(piles):
+    """
+    Returns True if the player to move wins with best play, with the
+    number of positions visited and how many of them were already solved.
+    The player who takes the last object loses, so an empty board is
+    a win for the player to move.
+    """
+    if piles in solved:
+        return solved[piles], 1, 1
+    nodes, hits = 1, 0
+    win = not any(piles)
+    for i, j in Nim.available_actions(piles):
+        child = list(piles)
+        child[i] -= j
+        child_win, child_nodes, child_hits = wins(tuple(sorted(child)))
+        nodes += child_nodes
+        hits += child_hits
+        if not child_win:
+            win = True
+            break
+    solved[piles] = win
+    return win, nodes, hits
+
+
+def choose(agent, piles, rng):
+    """
+    Returns (action, nodes, hits) for agent's move: the (state, action)
+    pairs or positions it looked at and how many were already known.
+    """
+    actions = sorted(Nim.available_actions(piles))
+    if agent == "random":
+        return rng.choice(actions), 0, 0
+
+    if agent == "q":
+        hits = sum((tuple(piles), action) in ai.q for action in actions)
+        return ai.choose_action(piles, epsilon=False), len(actions), hits
+
+    # Leave the opponent a losing position if there is one
+    nodes = hits = 0
+    for i, j in actions:
+        child = list(piles)
+        child[i] -= j
+        win, child_nodes, child_hits = wins(tuple(sorted(child)))
+        nodes += child_nodes
+        hits += child_hits
+        if not win:
+            return (i, j), nodes, hits
+    return actions[0], nodes, hits
+
+
+def play_game(agents, initial, seed):
+    """
+    Play one game between agents (player 0's, player 1's). Returns the
+    winner and a list of (player, seconds, nodes, hits) for each move.
+    """
+    rng = random.Random(seed)
+    game = Nim(initial)
+    moves = []
+    while game.winner is None:
+        agent = agents[game.player]
+        start = time.perf_counter()
+        action, nodes, hits = choose(agent, game.piles, rng)
+        moves.append((game.player, time.perf_counter() - start, nodes, hits))
+        game.move(action)
+    return game.winner, moves
+
+
+def init_worker(q):
+    """
+    Worker initializer: rebuild the trained AI from its Q-values.
+    """
+    global ai
+    ai = NimAI()
+    ai.q = q
+
+
+def play_games(task):
+    """
+    Worker entry point playing games for one (agents, initial, seeds) task.
+    """
+    agents, initial, seeds = task
+    return [play_game(agents, initial, seed) for seed in seeds]
+
+
+def percentiles(samples):
+    """
+    Returns summary statistics of a list of seconds, in milliseconds.
+    """
+    if not samples:
+        return {}
+    samples = sorted(samples)
+    pick = lambda p: samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+    return {
+        "mean": sum(samples) / len(samples) * 1000,
+        "p50": pick(0.5),
+        "p90": pick(0.9),
+        "p99": pick(0.99),
+        "max": samples[-1] * 1000
+    }
+
+
+def run(first, second, games=1000, workers=1, initial=[1, 3, 5, 7], training=10000, seed=0):
+    """
+    Play games between agent first (player 0) and agent second
+    (player 1) across worker processes, after training the Q-learning
+    AI on training games, and return a report of the results.
+    """
+    q = {}
+    train_seconds = 0
+    if "q" in (first, second):
+        # Training reports every game it plays, so keep it quiet
+        random.seed(seed)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            q = train(training).q
+        train_seconds = time.perf_counter() - start
+
+    seeds = [seed + i for i in range(games)]
+    chunk = max(1, games // (workers * 4))
+    tasks = [((first, second), initial, seeds[i:i + chunk]) for i in range(0, games, chunk)]
+
+    start = time.perf_counter()
+    if workers <= 1:
+        init_worker(q)
+        results = [play_games(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(workers, initializer=init_worker, initargs=(q,)) as pool:
+            results = pool.map(play_games, tasks)
+    seconds = time.perf_counter() - start
+
+    outcomes = {"0": 0, "1": 0}
+    sides = [{"latencies": [], "nodes": 0, "hits": 0} for _ in range(2)]
+    for batch in results:
+        for winner, moves in batch:
+            outcomes[str(winner)] += 1
+            for player, latency, nodes, hits in moves:
+                sides[player]["latencies"].append(latency)
+                sides[player]["nodes"] += nodes
+                sides[player]["hits"] += hits
+
+    agents = {}
+    for player, agent in enumerate((first, second)):
+        stats = sides[player]
+        agents[str(player)] = {
+            "agent": agent,
+            "moves": len(stats["latencies"]),
+            "latency_ms": percentiles(stats["latencies"]),
+            "nodes": stats["nodes"],
+            "hits": stats["hits"],
+            "hit_rate": stats["hits"] / stats["nodes"] if stats["nodes"] else None
+        }
+
+    return {
+        "game": "nim",
+        "config": {"initial": initial, "training": training, "seed": seed},
+        "games": games,
+        "workers": workers,
+        "train_seconds": train_seconds,
+        "seconds": seconds,
+        "outcomes": outcomes,
+        "agents": agents
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Nim agents against each other.")
+    parser.add_argument("--first", choices=AGENTS, default="q", help="agent moving first")
+    parser.add_argument("--second", choices=AGENTS, default="optimal", help="agent moving second")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--piles", type=int, nargs="+", default=[1, 3, 5, 7])
+    parser.add_argument("--train", type=int, default=10000,
+                        help="games the Q-learning agent trains on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.first, args.second, args.games, args.workers, args.piles, args.train, args.seed)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
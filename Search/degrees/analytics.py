@@ -0,0 +1,220 @@
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from graph import CSRGraph
+from snapshot import load_snapshot
+
+# Names of the CSR arrays making up the adjacency
+ARRAYS = ["person_offsets", "person_movies", "movie_offsets", "movie_stars"]
+
+# Adjacency arrays attached in a worker process
+shared = None
+
+
+class Adjacency():
+    """
+    NumPy views of the CSR arrays of a graph.
+    """
+
+    def __init__(self, person_offsets, person_movies, movie_offsets, movie_stars):
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        self.person_count = len(person_offsets) - 1
+        self.movie_count = len(movie_offsets) - 1
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Wrap the arrays of a CSRGraph without copying them.
+        """
+        return cls(*(np.asarray(getattr(graph, name)) for name in ARRAYS))
+
+
+class SharedAdjacency():
+    """
+    Copies the CSR arrays of a graph into one shared memory block
+    that worker processes can attach to by name.
+    """
+
+    def __init__(self, graph):
+        arrays = [np.asarray(getattr(graph, name)) for name in ARRAYS]
+        self.layout = []
+        size = 0
+        for array in arrays:
+            self.layout.append((size, array.dtype.str, len(array)))
+            size += array.nbytes
+        self.memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for array, (offset, dtype, length) in zip(arrays, self.layout):
+            np.ndarray(length, dtype, self.memory.buf, offset)[:] = array
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+
+def attach(name, layout):
+    """
+    Worker initializer: map the shared adjacency into this process.
+    """
+    global shared
+    memory = shared_memory.SharedMemory(name=name)
+    arrays = [np.ndarray(length, dtype, memory.buf, offset) for offset, dtype, length in layout]
+    shared = Adjacency(*arrays)
+
+    # Keep the block mapped for as long as the views are in use
+    shared.memory = memory
+
+
+def gather(offsets, indices, rows):
+    """
+    Returns the concatenation of the CSR rows of indices for every
+    row in rows, without a Python-level loop.
+    """
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return indices[:0]
+
+    # Shift each output position back to the start of its own row
+    shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[shifts + np.arange(total)]
+
+
+def distances_from(adjacency, source):
+    """
+    Returns an array of degrees of separation from source to every
+    person (-1 where unreachable), expanding one whole level at a time.
+    """
+    distances = np.full(adjacency.person_count, -1, dtype=np.int32)
+    seen_movies = np.zeros(adjacency.movie_count, dtype=bool)
+    distances[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while len(frontier):
+        level += 1
+
+        # Movies of the frontier not already used by an earlier level
+        movies = gather(adjacency.person_offsets, adjacency.person_movies, frontier)
+        movies = np.unique(movies[~seen_movies[movies]])
+        seen_movies[movies] = True
+
+        # Their stars not already reached become the next frontier
+        people = gather(adjacency.movie_offsets, adjacency.movie_stars, movies)
+        people = np.unique(people[distances[people] < 0])
+        distances[people] = level
+        frontier = people.astype(np.int64)
+    return distances
+
+
+def summarize(source, distances):
+    """
+    Returns the degree distribution and eccentricity of one source.
+    """
+    reached = distances[distances >= 0]
+    return {
+        "source": int(source),
+        "histogram": np.bincount(reached).tolist(),
+        "unreachable": int(len(distances) - len(reached)),
+        "eccentricity": int(reached.max())
+    }
+
+
+def summarize_source(source):
+    """
+    Worker entry point summarizing one source over the shared adjacency.
+    """
+    return summarize(source, distances_from(shared, source))
+
+
+def run_sources(graph, sources, workers):
+    """
+    Yields a summary for every source, computed across a pool of
+    processes that share one copy of the adjacency.
+    """
+    if workers <= 1:
+        adjacency = Adjacency.from_graph(graph)
+        for source in sources:
+            yield summarize(source, distances_from(adjacency, source))
+        return
+
+    block = SharedAdjacency(graph)
+    try:
+        with multiprocessing.Pool(workers, initializer=attach,
+                                  initargs=(block.memory.name, block.layout)) as pool:
+            yield from pool.imap_unordered(summarize_source, sources, chunksize=4)
+    finally:
+        block.close()
+
+
+def estimate_diameter(adjacency, source, sweeps=4):
+    """
+    Returns (lower, upper) bounds on the diameter of the component
+    holding source by repeated double sweeps: every eccentricity is a
+    lower bound, and twice any eccentricity is an upper bound.
+    """
+    lower, upper = 0, None
+    person = source
+    for _ in range(sweeps):
+        distances = distances_from(adjacency, person)
+        eccentricity = int(distances.max())
+        lower = max(lower, eccentricity)
+        upper = 2 * eccentricity if upper is None else min(upper, 2 * eccentricity)
+        person = int(np.argmax(distances))
+    return lower, upper
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Degree-of-separation distributions for the cast graph.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--source", action="append", default=[], metavar="NAME",
+                        help="person to measure from (may be repeated)")
+    parser.add_argument("--sample", type=int, default=0, metavar="N",
+                        help="also measure from N random people")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--diameter", action="store_true",
+                        help="estimate the diameter of the first source's component")
+    args = parser.parse_args()
+
+    graph = load_snapshot(args.directory) or CSRGraph.from_csv(args.directory)
+
+    sources = []
+    for name in args.source:
+        people = graph.name_index.get(name.lower(), [])
+        if len(people) != 1:
+            sys.exit(f"Expected exactly one person named '{name}', found {len(people)}.")
+        sources.append(people[0])
+    sources += random.Random(args.seed).sample(range(len(graph.person_ids)), args.sample)
+    if not sources:
+        sys.exit("Give at least one --source or --sample.")
+
+    # One JSON line per source, then the distribution over all of them
+    start = time.perf_counter()
+    total = []
+    for result in run_sources(graph, sources, args.workers):
+        result["source"] = graph.person_ids[result["source"]]
+        print(json.dumps(result))
+        histogram = result["histogram"]
+        total += [0] * (len(histogram) - len(total))
+        for degree, count in enumerate(histogram):
+            total[degree] += count
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"sources": len(sources), "histogram": total, "seconds": round(elapsed, 3)}))
+
+    if args.diameter:
+        lower, upper = estimate_diameter(Adjacency.from_graph(graph), sources[0])
+        print(json.dumps({"diameter_lower": lower, "diameter_upper": upper}))
+
+
+if __name__ == "__main__":
+    main()
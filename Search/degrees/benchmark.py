@@ -0,0 +1,105 @@
+import argparse
+import heapq
+import time
+
+from graph import CSRGraph
+from snapshot import load_snapshot
+from util import Node, StackFrontier, QueueFrontier, PriorityFrontier
+
+
+class LinearStackFrontier():
+    """
+    The original stack frontier: linear membership scans
+    and a full list copy on every removal.
+    """
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        node = self.frontier[-1]
+        self.frontier = self.frontier[:-1]
+        return node
+
+
+class LinearQueueFrontier(LinearStackFrontier):
+
+    def remove(self):
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+class LinearPriorityFrontier(LinearStackFrontier):
+    """
+    The original A* frontier: a heap of (priority, node)
+    tuples whose membership test scans every entry.
+    """
+
+    def add(self, node, priority=None):
+        heapq.heappush(self.frontier, (node.cost if priority is None else priority, node))
+
+    def contains_state(self, state):
+        return any(node.state == state for _, node in self.frontier)
+
+    def remove(self):
+        return heapq.heappop(self.frontier)[1]
+
+
+def explore(graph, source, frontier, limit):
+    """
+    Run a graph search from source until the frontier is exhausted or
+    limit people have been explored, returning the number explored.
+    """
+    frontier.add(Node(state=source, parent=None, action=None))
+    explored = set()
+    while not frontier.empty() and len(explored) < limit:
+        node = frontier.remove()
+        explored.add(node.state)
+        for movie, person in graph.neighbors(node.state):
+            if person not in explored and not frontier.contains_state(person):
+                frontier.add(Node(state=person, parent=node, action=movie, cost=node.cost + 1))
+    return len(explored)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare frontier implementations on the cast graph.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--limit", type=int, default=20000,
+                        help="stop each search after exploring this many people")
+    args = parser.parse_args()
+
+    graph = load_snapshot(args.directory) or CSRGraph.from_csv(args.directory)
+
+    # Start from the person in the most movies so the search has room to grow
+    source = max(
+        range(len(graph.person_ids)),
+        key=lambda person: graph.person_offsets[person + 1] - graph.person_offsets[person]
+    )
+
+    pairs = [
+        ("stack", LinearStackFrontier, StackFrontier),
+        ("queue", LinearQueueFrontier, QueueFrontier),
+        ("priority", LinearPriorityFrontier, PriorityFrontier)
+    ]
+    print(f"{'frontier':<10}{'before (nodes/s)':>20}{'after (nodes/s)':>20}{'speedup':>10}")
+    for name, before, after in pairs:
+        rates = []
+        for frontier in (before, after):
+            start = time.perf_counter()
+            count = explore(graph, source, frontier(), args.limit)
+            rates.append(count / (time.perf_counter() - start))
+        print(f"{name:<10}{rates[0]:>20,.0f}{rates[1]:>20,.0f}{rates[1] / rates[0]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
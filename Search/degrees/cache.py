@@ -0,0 +1,200 @@
+import json
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+
+
+class PathCache():
+    """
+    Memoizes shortest paths keyed on (source, target) with LRU eviction.
+
+    Sources queried at least hot_after times get a full breadth-first
+    tree, built with build_tree(source) and kept in a second, smaller
+    LRU, so any later query from them is answered by tree_path(tree,
+    target). Paths can also be kept in an SQLite file that survives
+    restarts and is shared safely between processes.
+    """
+
+    def __init__(self, build_tree, tree_path, capacity=10000, tree_capacity=16,
+                 hot_after=3, filename=None, version=""):
+        self.build_tree = build_tree
+        self.tree_path = tree_path
+        self.capacity = capacity
+        self.tree_capacity = tree_capacity
+        self.hot_after = hot_after
+        self.filename = filename
+        self.version = version
+
+        self.paths = OrderedDict()
+        self.trees = OrderedDict()
+        self.queries = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.tree_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # SQLite connections must not cross a fork, so open one per process
+        self.connection = None
+        self.pid = None
+
+    def get(self, source, target):
+        """
+        Returns (True, path) if the answer is known, where path is None
+        for people who are not connected, or (False, None) on a miss.
+        """
+        key = (source, target)
+        with self.lock:
+            if key in self.paths:
+                self.paths.move_to_end(key)
+                self.hits += 1
+                return True, self.paths[key]
+
+            tree = self.trees.get(source)
+            if tree is not None:
+                self.trees.move_to_end(source)
+                self.tree_hits += 1
+            else:
+                found, path = self.read(key)
+                if found:
+                    self.disk_hits += 1
+                    self.remember(key, path)
+                    return True, path
+
+                # Once a source turns out to be popular, answer from its
+                # tree; the query that builds it counts as a tree hit.
+                # Query counts are kept for the capacity most recent sources
+                count = self.queries.pop(source, 0) + 1
+                if self.tree_capacity == 0 or count < self.hot_after:
+                    self.queries[source] = count
+                    if len(self.queries) > self.capacity:
+                        self.queries.popitem(last=False)
+                    self.misses += 1
+                    return False, None
+                self.tree_hits += 1
+
+        # Trees are built and walked outside the lock, so one slow
+        # breadth-first search does not hold up every other query
+        if tree is None:
+            tree = self.build_tree(source)
+            with self.lock:
+                self.trees[source] = tree
+                self.trees.move_to_end(source)
+                if len(self.trees) > self.tree_capacity:
+                    self.trees.popitem(last=False)
+        return True, self.tree_path(tree, target)
+
+    def put(self, source, target, path):
+        """
+        Remember the shortest path from source to target (None if not connected).
+        """
+        with self.lock:
+            self.remember((source, target), path)
+            self.write((source, target), path)
+
+    def remember(self, key, path):
+        self.paths[key] = path
+        self.paths.move_to_end(key)
+        if len(self.paths) > self.capacity:
+            self.paths.popitem(last=False)
+
+    def stats(self):
+        """
+        Returns hit and miss counters and current sizes.
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "tree_hits": self.tree_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "paths": len(self.paths),
+                "trees": len(self.trees)
+            }
+
+    def database(self):
+        """
+        Returns this process's connection to the on-disk tier, or None.
+        """
+        if self.filename is None:
+            return None
+        if self.pid != os.getpid():
+            self.connection = sqlite3.connect(self.filename, timeout=30, check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS paths "
+                "(version TEXT, source TEXT, target TEXT, path TEXT, PRIMARY KEY (version, source, target))"
+            )
+            # Drop answers computed from other versions of the data
+            self.connection.execute("DELETE FROM paths WHERE version != ?", (self.version,))
+            self.connection.commit()
+            self.pid = os.getpid()
+        return self.connection
+
+    def read(self, key):
+        connection = self.database()
+        if connection is None:
+            return False, None
+        row = connection.execute(
+            "SELECT path FROM paths WHERE version = ? AND source = ? AND target = ?",
+            (self.version, *key)
+        ).fetchone()
+        if row is None:
+            return False, None
+        path = json.loads(row[0])
+        return True, None if path is None else [tuple(step) for step in path]
+
+    def write(self, key, path):
+        connection = self.database()
+        if connection is None:
+            return
+        connection.execute(
+            "INSERT OR REPLACE INTO paths VALUES (?, ?, ?, ?)",
+            (self.version, *key, json.dumps(path))
+        )
+        connection.commit()
+
+
+def bfs_tree(graph, source):
+    """
+    Returns a breadth-first tree of a CSRGraph from source as two
+    arrays giving, for every person, the parent person and the movie
+    linking them (-1 where not reached).
+    """
+    parents = array("i", [-1]) * len(graph.person_ids)
+    links = array("i", [-1]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    parents[source] = source
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for person in frontier:
+            for movie in graph.movies_for_person(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in graph.stars_for_movie(movie):
+                    if parents[star] == -1:
+                        parents[star] = person
+                        links[star] = movie
+                        next_frontier.append(star)
+        frontier = next_frontier
+    return source, parents, links
+
+
+def tree_path(tree, target):
+    """
+    Returns the list of (movie, person) index pairs from the root of a
+    bfs_tree to target, or None if target was not reached.
+    """
+    source, parents, links = tree
+    if parents[target] == -1:
+        return None
+    path = []
+    while target != source:
+        path.append((links[target], target))
+        target = parents[target]
+    path.reverse()
+    return path
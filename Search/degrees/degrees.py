@@ -1,8 +1,21 @@
+import argparse
 import csv
+import itertools
+import json
+import multiprocessing
+import os
 import sys
-import heapq
-
-from util import Node, StackFrontier, QueueFrontier
+import math
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from cache import PathCache, bfs_tree, tree_path
+from graph import CSRGraph
+from landmarks import Landmarks
+from nameindex import NameIndex
+import paths
+from snapshot import SOURCES, load_snapshot, save_snapshot
+from util import Node, StackFrontier, QueueFrontier, PriorityFrontier
 
 EMPTY = 0
 
@@ -15,11 +28,39 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact integer-indexed graph, used instead of the dicts above
+# when data is loaded with the "csr" backend
+graph = None
+
+# Landmark distances for the A* heuristic, computed over the graph
+landmarks = None
+
+# Name index of whichever backend is loaded, and the person_id
+# of each person index it returns
+name_index = None
+name_people = None
+
+# Search used to answer queries, "bidirectional" or "astar"
+strategy = "bidirectional"
 
-def load_data(directory):
+# Memoized answers to earlier queries, if enabled
+cache = None
+
+
+def load_data(directory, backend="dict", workers=1, report=None):
     """
     Load data from CSV files into memory.
     """
+    global graph, name_index, name_people
+    if backend == "csr":
+        # Prefer a memory-mapped snapshot that still matches the CSVs
+        graph = load_snapshot(directory)
+        if graph is None:
+            graph = CSRGraph.from_csv(directory, workers, report)
+        name_index = graph.name_index
+        name_people = graph.person_ids
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -54,15 +95,76 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    # Index names for prefix and fuzzy lookups
+    name_people = list(people)
+    name_index = NameIndex.build([people[person_id]["name"] for person_id in name_people])
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
-    # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    parser = argparse.ArgumentParser(usage="python degrees.py [directory] [--backend BACKEND] [--build-index] "
+                                           "[--batch FILE [--workers N] | --serve PORT]")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--backend", choices=["csr", "dict"], default="csr")
+    parser.add_argument("--build-index", action="store_true",
+                        help="write a binary snapshot of the data and exit")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer tab-separated name pairs from FILE ('-' for stdin) as JSON lines")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes answering batch queries")
+    parser.add_argument("--serve", metavar="PORT", type=int,
+                        help="answer queries over HTTP on localhost:PORT")
+    parser.add_argument("--search", choices=["bidirectional", "astar"], default="bidirectional")
+    parser.add_argument("--load-workers", type=int, default=os.cpu_count(),
+                        help="number of processes parsing stars.csv (csr backend only)")
+    parser.add_argument("--landmarks", metavar="K", type=int, default=8,
+                        help="number of landmarks for the A* heuristic (csr backend only)")
+    parser.add_argument("--all", action="store_true",
+                        help="list every shortest path")
+    parser.add_argument("--k", type=int, default=0,
+                        help="list the K shortest loopless paths")
+    parser.add_argument("--cache-size", type=int, default=10000,
+                        help="number of query results to keep in memory (0 disables caching)")
+    parser.add_argument("--cache-file", metavar="FILE",
+                        help="also keep query results in an SQLite file that survives restarts")
+    args = parser.parse_args()
+
+    if args.build_index:
+        print("Building index...")
+        path = save_snapshot(CSRGraph.from_csv(args.directory, args.load_workers, sys.stdout),
+                             args.directory)
+        print(f"Index written to {path}.")
+        return
+
+    # Load data from files into memory, keeping stdout for results
+    # when answering queries non-interactively
+    log = sys.stderr if args.batch or args.serve else sys.stdout
+    print("Loading data...", file=log)
+    load_data(args.directory, args.backend, args.load_workers, log)
+    print("Data loaded.", file=log)
+
+    global strategy, landmarks, cache
+    strategy = args.search
+    if strategy == "astar" and graph is not None and args.landmarks > 0:
+        print("Computing landmarks...", file=log)
+        landmarks = Landmarks(graph, args.landmarks)
+    if args.cache_size > 0:
+        cache = PathCache(build_tree, walk_tree, capacity=args.cache_size,
+                          filename=args.cache_file, version=data_version(args.directory))
+
+    if args.batch:
+        if args.batch == "-":
+            run_batch(sys.stdin, args.workers, args.directory, args.backend)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(f, args.workers, args.directory, args.backend)
+        if cache is not None and args.workers <= 1:
+            print(f"Cache: {json.dumps(cache.stats())}", file=log)
+        return
+
+    if args.serve:
+        print(f"Serving on http://127.0.0.1:{args.serve}/", file=log)
+        serve(args.serve)
+        return
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -71,69 +173,402 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.all or args.k:
+        # Paths are generated lazily, so only the ones printed are built
+        if args.all:
+            found = all_shortest_paths(source, target)
+        else:
+            found = itertools.islice(k_shortest_paths(source, target), args.k)
+        count = 0
+        for count, path in enumerate(found, 1):
+            print(f"Path {count}:")
+            print_path(source, path)
+        if count == 0:
+            print("Not connected.")
+        return
+
+    path, expanded = search(source, target)
+    print(f"People expanded: {expanded}")
 
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
+
+
+def print_path(source, path):
+    """
+    Print the degrees of separation along a path from source.
+    """
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = person_name(path[i][1])
+        person2 = person_name(path[i + 1][1])
+        movie = movie_title(path[i + 1][0])
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def answer_query(source_name, target_name):
+    """
+    Answers one query between two names without prompting,
+    returning a dictionary that can be serialized as JSON.
+    """
+    result = {"source": source_name, "target": target_name}
+
+    ends = []
+    for name in (source_name, target_name):
+        person_ids = person_ids_for_name(name)
+        if len(person_ids) == 0:
+            result["error"] = f"person not found: {name}"
+            result["suggestions"] = [
+                {"id": person_id, "name": person_name(person_id), "birth": person_birth(person_id)}
+                for person_id in suggest_names(name)
+            ]
+            return result
+        if len(person_ids) > 1:
+            result["error"] = f"ambiguous name: {name}"
+            result["candidates"] = [
+                {"id": person_id, "name": person_name(person_id), "birth": person_birth(person_id)}
+                for person_id in person_ids
+            ]
+            return result
+        ends.append(person_ids[0])
+
+    path, expanded = search(*ends)
+    result["expanded"] = expanded
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [
+            {"movie_id": movie_id, "movie": movie_title(movie_id),
+             "person_id": person_id, "person": person_name(person_id)}
+            for movie_id, person_id in path
+        ]
+    return result
+
+
+def answer_line(line):
+    """
+    Worker entry point answering a line holding two tab-separated names.
+    """
+    fields = line.split("\t")
+    if len(fields) != 2:
+        return {"line": line, "error": "expected two tab-separated names"}
+    return answer_query(fields[0].strip(), fields[1].strip())
+
+
+def init_worker(directory, backend):
+    """
+    Load data in a worker process unless it was inherited by fork.
+    """
+    if graph is None and not people:
+        load_data(directory, backend)
+
+
+def run_batch(lines, workers, directory, backend):
+    """
+    Answers every tab-separated name pair in lines against the loaded
+    data, writing one JSON object per line to stdout in input order.
+    """
+    lines = [line.rstrip("\n") for line in lines if line.strip()]
+
+    if workers <= 1:
+        for line in lines:
+            print(json.dumps(answer_line(line)))
+        return
+
+    # Queries are independent, so spread them over a pool of processes
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(directory, backend)) as pool:
+        for result in pool.imap(answer_line, lines, chunksize=16):
+            print(json.dumps(result))
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET /?source=NAME&target=NAME with a JSON result,
+    and GET /stats with the cache counters.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            self.reply(200, cache.stats() if cache is not None else {})
+            return
+        query = parse_qs(url.query)
+        if "source" not in query or "target" not in query:
+            self.reply(400, {"error": "expected source and target parameters"})
+            return
+        self.reply(200, answer_query(query["source"][0], query["target"][0]))
+
+    def reply(self, status, result):
+        body = json.dumps(result).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(format % args, file=sys.stderr)
+
+
+def serve(port):
+    """
+    Answer queries over HTTP on localhost, keeping the loaded data
+    resident until interrupted.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), QueryHandler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
 
 
 def shortest_path(source, target):
     """
     Returns the shortest list of (movie_id, person_id) pairs
-    that connect the source to the target using A* search.
+    that connect the source to the target.
     If no possible path, returns None.
     """
-    # Initialize the frontier with the source node
-    start_node = Node(state=source, parent=None, action=None, cost=0)
+    path, _ = search(source, target)
+    return path
+
+
+def search(source, target):
+    """
+    Returns a (path, expanded) tuple for the shortest path from source
+    to target, answering from the cache when possible (expanding no one).
+    """
+    if cache is not None:
+        found, path = cache.get(source, target)
+        if found:
+            return path, 0
+
+    path, expanded = run_search(source, target)
+    if cache is not None:
+        cache.put(source, target, path)
+    return path, expanded
+
+
+def run_search(source, target):
+    """
+    Returns a (path, expanded) tuple for the shortest path from source
+    to target, searching whichever backend has been loaded with the
+    selected strategy.
+    """
+    if graph is None:
+        if strategy == "astar":
+            return a_star_search(source, target)
+        return bidirectional_search(source, target)
+
+    start, goal = graph.person_index[source], graph.person_index[target]
+    if strategy == "astar":
+        bound = landmarks.bound_for(goal) if landmarks is not None else None
+        path, expanded = a_star_search(start, goal, graph.neighbors, bound)
+    else:
+        path, expanded = bidirectional_search(start, goal, graph.neighbors)
+    if path is None:
+        return None, expanded
+    return graph.path_ids(path), expanded
+
+
+def build_tree(source):
+    """
+    Returns a breadth-first tree of everyone reachable from source,
+    for the cache to answer later queries from that source.
+    """
+    if graph is not None:
+        return bfs_tree(graph, graph.person_index[source])
+
+    tree = {source: None}
+    frontier = [source]
+    while frontier:
+        next_frontier = []
+        for person_id in frontier:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id not in tree:
+                    tree[neighbor_id] = (movie_id, person_id)
+                    next_frontier.append(neighbor_id)
+        frontier = next_frontier
+    return tree
+
+
+def walk_tree(tree, target):
+    """
+    Returns the path to target in a tree from build_tree,
+    or None if target is not connected.
+    """
+    if graph is not None:
+        path = tree_path(tree, graph.person_index[target])
+        return None if path is None else graph.path_ids(path)
+
+    if target not in tree:
+        return None
+    path = []
+    while tree[target] is not None:
+        movie_id, person_id = tree[target]
+        path.append((movie_id, target))
+        target = person_id
+    path.reverse()
+    return path
+
+
+def data_version(directory):
+    """
+    Returns a string that changes whenever the CSV files change.
+    """
+    stats = [os.stat(os.path.join(directory, name)) for name in SOURCES]
+    return ";".join(f"{stat.st_size}:{stat.st_mtime_ns}" for stat in stats)
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connect the source to the target, one at a time.
+    """
+    if graph is None:
+        yield from paths.all_shortest_paths(source, target, neighbors_for_person)
+        return
+    start, goal = graph.person_index[source], graph.person_index[target]
+    for path in paths.all_shortest_paths(start, goal, graph.neighbors):
+        yield graph.path_ids(path)
+
+
+def k_shortest_paths(source, target):
+    """
+    Yields lists of (movie_id, person_id) pairs that connect the source
+    to the target without repeating a person or a movie, shortest first.
+    """
+    if graph is None:
+        yield from paths.k_shortest_paths(source, target, neighbors_for_person)
+        return
+    start, goal = graph.person_index[source], graph.person_index[target]
+    for path in paths.k_shortest_paths(start, goal, graph.neighbors):
+        yield graph.path_ids(path)
 
-    # Priority queue initialized with (priority, node) tuples
-    frontier = []
-    # Use a heuristic value of 0 for the start node
-    heapq.heappush(frontier, (0, start_node))
+
+def bidirectional_search(source, target, neighbors=None):
+    """
+    Returns a (path, expanded) tuple, where path is the shortest list of
+    (movie_id, person_id) pairs that connect the source to the target
+    (None if not connected) and expanded is the number of people whose
+    neighbors were generated.
+
+    Breadth-first search runs from both ends, always growing the smaller
+    frontier by one whole level, and stops as soon as the two sides meet.
+    Nodes are expanded with neighbors(node), which yields (action, node)
+    pairs and defaults to neighbors_for_person.
+    """
+    if neighbors is None:
+        neighbors = neighbors_for_person
+    if source == target:
+        return [], 0
+
+    # Each side maps a reached person to the (movie_id, person_id) step
+    # that reached it, pointing back towards the side's own endpoint
+    parents = [{source: None}, {target: None}]
+    frontiers = [[source], [target]]
+    expanded = 0
+
+    while frontiers[0] and frontiers[1]:
+        # Grow the side with the smaller frontier
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own, other = parents[side], parents[1 - side]
+
+        next_frontier = []
+        for person_id in frontiers[side]:
+            expanded += 1
+            for movie_id, neighbor_id in neighbors(person_id):
+                if neighbor_id in own:
+                    continue
+                own[neighbor_id] = (movie_id, person_id)
+
+                # Both sides expand whole levels, so the first meeting
+                # point already lies on a shortest path
+                if neighbor_id in other:
+                    return join_paths(parents[0], parents[1], neighbor_id), expanded
+                next_frontier.append(neighbor_id)
+        frontiers[side] = next_frontier
+
+    # One side ran out of people without meeting the other
+    return None, expanded
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Helper function to build the path from source to target out of
+    the parent maps of a bidirectional search that met at `meeting`.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, child_id = backward[person_id]
+        path.append((movie_id, child_id))
+        person_id = child_id
+    return path
+
+
+def a_star_search(source, target, neighbors=None, heuristic=None):
+    """
+    Returns a (path, expanded) tuple like bidirectional_search, found by
+    A* search over unit-cost edges. heuristic(node) must never
+    overestimate the distance from node to target (math.inf prunes the
+    node entirely); it defaults to 0, which makes the search uniform-cost.
+    """
+    if neighbors is None:
+        neighbors = neighbors_for_person
+    if heuristic is None:
+        heuristic = lambda node: 0
+
+    # Initialize the frontier with the source node, prioritized
+    # by estimated total cost
+    start_node = Node(state=source, parent=None, action=None, cost=0)
+    frontier = PriorityFrontier()
+    frontier.add(start_node, heuristic(source))
 
     # Initialize explored set to keep track of explored people
     explored = set()
 
-    # While the frontier is not empty
-    while frontier:
-        # Remove the node with the lowest heuristic score
-        _, current_node = heapq.heappop(frontier)
+    while not frontier.empty():
+        # Remove the node with the lowest estimated total cost
+        current_node = frontier.remove()
 
-        # If the current node is the target, build and return the path
+        # Test for the goal when removing, not when adding, so the
+        # first path found is the cheapest one
         if current_node.state == target:
-            return build_path(current_node)
+            return build_path(current_node), len(explored)
 
         # Mark the current node as explored
         explored.add(current_node.state)
 
         # Expand neighbors
-        for movie_id, person_id in neighbors_for_person(current_node.state):
-            # If this neighbor has not been explored and is not in the frontier
-            if person_id not in explored and not any(node.state == person_id for _, node in frontier):
-                # Create a new node for this neighbor
-                child_node = Node(state=person_id, parent=current_node, action=movie_id)
-
-                # Calculate heuristic value for this child node
-                heuristic_value = heuristic(child_node.state, target)
-
-                # If this child node is the target, return the path
-                if person_id == target:
-                    return build_path(child_node)
-
-                # Add the child node to the frontier with its heuristic value
-                heapq.heappush(frontier, (heuristic_value, child_node))
+        cost = current_node.cost + 1
+        for movie_id, person_id in neighbors(current_node.state):
+            if person_id in explored:
+                continue
+            estimate = heuristic(person_id)
+            if estimate == math.inf:
+                continue
+
+            # The frontier keeps only the cheaper of two routes to a person
+            child_node = Node(state=person_id, parent=current_node, action=movie_id, cost=cost)
+            frontier.add(child_node, cost + estimate)
 
     # If no path is found, return None
-    return None
+    return None, len(explored)
 
 
 def build_path(node):
@@ -149,36 +584,31 @@ def build_path(node):
     return path
 
 
-def heuristic(person_id, target_id):
-    """
-    Heuristic function that returns an estimate of the distance from the current person
-    to the target person, based on the number of common movies.
-    """
-    # Get the movies for both the person and the target
-    person_movies = people[person_id]["movies"]
-    target_movies = people[target_id]["movies"]
-
-    # Calculate the number of common movies
-    common_movies = person_movies.intersection(target_movies)
-
-    # Heuristic: The fewer the common movies, the greater the heuristic value
-    return 1 / (len(common_movies) + 1)  # +1 to avoid division by zero
-
-
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
+        # Offer close matches rather than giving up on a typo
+        person_ids = suggest_names(name)
+        if len(person_ids) == 0:
+            return None
+        print(f"No one named '{name}'. Did you mean:")
+        for person_id in person_ids:
+            name = person_name(person_id)
+            birth = person_birth(person_id)
+            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+        person_id = input("Intended Person ID: ")
+        if person_id in person_ids:
+            return person_id
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            name = person_name(person_id)
+            birth = person_birth(person_id)
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -191,11 +621,62 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_name(name):
+    """
+    Returns the list of IMDB ids for people with a given name.
+    """
+    if graph is not None:
+        return [graph.person_ids[person] for person in graph.name_index.get(name.lower(), [])]
+    return list(names.get(name.lower(), set()))
+
+
+def suggest_names(name, limit=10):
+    """
+    Returns IMDB ids of up to limit people whose names start with or
+    resemble name, best match first.
+    """
+    if name_index is None:
+        return []
+    return [name_people[person] for _, person in name_index.search(name, limit)]
+
+
+def person_name(person_id):
+    """
+    Returns the name of a person from the loaded backend.
+    """
+    if graph is not None:
+        return graph.person_names[graph.person_index[person_id]]
+    return people[person_id]["name"]
+
+
+def person_birth(person_id):
+    """
+    Returns the birth year of a person from the loaded backend.
+    """
+    if graph is not None:
+        return graph.person_births[graph.person_index[person_id]]
+    return people[person_id]["birth"]
+
+
+def movie_title(movie_id):
+    """
+    Returns the title of a movie from the loaded backend.
+    """
+    if graph is not None:
+        return graph.movie_titles[graph.movie_index[movie_id]]
+    return movies[movie_id]["title"]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {
+            (graph.movie_ids[movie], graph.person_ids[person])
+            for movie, person in graph.neighbors(graph.person_index[person_id])
+        }
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
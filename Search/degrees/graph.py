@@ -0,0 +1,168 @@
+from array import array
+
+import ingest
+from nameindex import NameIndex
+
+
+class CSRGraph():
+    """
+    Bipartite person-movie graph with people and movies interned to dense
+    integers and adjacency stored as CSR (offsets + indices) arrays.
+
+    The movies of person p are
+        person_movies[person_offsets[p]:person_offsets[p + 1]]
+    and the stars of movie m are
+        movie_stars[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self):
+        # Interned IDs and attributes, indexed by dense integer
+        self.person_ids = []
+        self.person_names = []
+        self.person_births = []
+        self.movie_ids = []
+        self.movie_titles = []
+        self.movie_years = []
+
+        # Maps string IDs to dense integers
+        self.person_index = {}
+        self.movie_index = {}
+
+        # Exact, prefix and fuzzy lookups of people by name
+        self.name_index = NameIndex.build([])
+
+        # Adjacency arrays, stored as memoryviews so slices never copy
+        self.person_offsets = memoryview(array("q", [0]))
+        self.person_movies = memoryview(array("i"))
+        self.movie_offsets = memoryview(array("q", [0]))
+        self.movie_stars = memoryview(array("i"))
+
+    @classmethod
+    def from_csv(cls, directory, workers=1, report=None):
+        """
+        Load people.csv, movies.csv and stars.csv from directory
+        into a new graph, parsing stars.csv across workers processes.
+        """
+        return ingest.load_into(cls(), directory, workers, report)
+
+    def add_person(self, person_id, name, birth):
+        """
+        Intern a person and return their dense index.
+        """
+        person = len(self.person_ids)
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        self.person_index[person_id] = person
+        return person
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Intern a movie and return its dense index.
+        """
+        movie = len(self.movie_ids)
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        self.movie_index[movie_id] = movie
+        return movie
+
+    def build(self, people, movies):
+        """
+        Build both CSR directions from parallel arrays of
+        (person, movie) edges, and the name index. Duplicate edges
+        are dropped.
+        """
+        person_count = len(self.person_ids)
+        movie_count = len(self.movie_ids)
+
+        # Counting sort the edges by person
+        person_offsets = offsets_for(people, person_count)
+        person_movies = array("i", bytes(4 * len(movies)))
+        cursor = array("q", person_offsets[:-1])
+        for person, movie in zip(people, movies):
+            person_movies[cursor[person]] = movie
+            cursor[person] += 1
+
+        # Sort each person's row and drop repeated movies in place
+        write = 0
+        for person in range(person_count):
+            start, end = person_offsets[person], person_offsets[person + 1]
+            person_offsets[person] = write
+            previous = -1
+            for movie in sorted(person_movies[start:end]):
+                if movie != previous:
+                    person_movies[write] = movie
+                    write += 1
+                    previous = movie
+        person_offsets[person_count] = write
+        del person_movies[write:]
+
+        # Transpose into movie -> stars, which keeps rows sorted by person
+        movie_offsets = offsets_for(person_movies, movie_count)
+        movie_stars = array("i", bytes(4 * len(person_movies)))
+        cursor = array("q", movie_offsets[:-1])
+        for person in range(person_count):
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                movie_stars[cursor[movie]] = person
+                cursor[movie] += 1
+
+        self.person_offsets = memoryview(person_offsets)
+        self.person_movies = memoryview(person_movies)
+        self.movie_offsets = memoryview(movie_offsets)
+        self.movie_stars = memoryview(movie_stars)
+        self.name_index = NameIndex.build(self.person_names)
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred with
+        the given person, walking contiguous slices of the CSR arrays.
+        """
+        person_offsets = self.person_offsets
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for movie in self.person_movies[person_offsets[person]:person_offsets[person + 1]]:
+            for star in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                yield movie, star
+
+    def movies_for_person(self, person):
+        """
+        Returns the movie indices of a person as a memoryview slice.
+        """
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_for_movie(self, movie):
+        """
+        Returns the person indices of a movie's stars as a memoryview slice.
+        """
+        return self.movie_stars[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def path_ids(self, path):
+        """
+        Convert a list of (movie, person) index pairs into
+        (movie_id, person_id) string pairs.
+        """
+        return [(self.movie_ids[movie], self.person_ids[person]) for movie, person in path]
+
+    def nbytes(self):
+        """
+        Returns the number of bytes held by the adjacency arrays.
+        """
+        return sum(view.nbytes for view in (
+            self.person_offsets, self.person_movies,
+            self.movie_offsets, self.movie_stars
+        ))
+
+
+def offsets_for(keys, count):
+    """
+    Returns a CSR offsets array of length count + 1
+    for rows keyed by the integers in keys.
+    """
+    offsets = array("q", bytes(8 * (count + 1)))
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    return offsets
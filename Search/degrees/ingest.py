@@ -0,0 +1,172 @@
+import csv
+import io
+import multiprocessing
+import os
+import time
+from array import array
+
+# Bytes read per chunk; chunks always end on a line boundary
+CHUNK_SIZE = 16 << 20
+
+# ID lookups used by worker processes parsing stars.csv
+person_index = None
+movie_index = None
+
+
+def load_into(graph, directory, workers=1, report=None, chunk_size=CHUNK_SIZE):
+    """
+    Load people.csv, movies.csv and stars.csv from directory into an
+    empty graph, reading large chunks and parsing rows as plain fields.
+    Chunks of stars.csv are parsed by a pool of worker processes when
+    workers > 1. Progress and timings are written to report if given.
+    """
+    # People and movies are interned in file order, so parse them here
+    start = time.perf_counter()
+    rows = 0
+    for block in read_chunks(f"{directory}/people.csv", chunk_size, header=True):
+        for person_id, name, birth in read_rows(block):
+            graph.add_person(person_id, name, birth)
+            rows += 1
+    log(report, f"people.csv: {rows:,} rows in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    rows = 0
+    for block in read_chunks(f"{directory}/movies.csv", chunk_size, header=True):
+        for movie_id, title, year in read_rows(block):
+            graph.add_movie(movie_id, title, year)
+            rows += 1
+    log(report, f"movies.csv: {rows:,} rows in {time.perf_counter() - start:.2f}s")
+
+    # Parse stars.csv one byte range at a time, merging edges as they arrive
+    start = time.perf_counter()
+    filename = f"{directory}/stars.csv"
+    ranges = split_ranges(filename, chunk_size)
+    people = array("i")
+    movies = array("i")
+    rows = 0
+    for done, (chunk_people, chunk_movies, chunk_rows) in enumerate(
+        parse_ranges(filename, ranges, graph, workers), 1
+    ):
+        people.frombytes(chunk_people)
+        movies.frombytes(chunk_movies)
+        rows += chunk_rows
+        log(report, f"stars.csv: {done}/{len(ranges)} chunks, {rows:,} rows, "
+                    f"{time.perf_counter() - start:.2f}s")
+    log(report, f"stars.csv: {len(people):,} of {rows:,} rows kept in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    graph.build(people, movies)
+    log(report, f"adjacency built in {time.perf_counter() - start:.2f}s")
+    return graph
+
+
+def parse_ranges(filename, ranges, graph, workers):
+    """
+    Yields parsed edges for each byte range of stars.csv, in order.
+    """
+    if workers <= 1 or len(ranges) <= 1:
+        set_indexes(graph.person_index, graph.movie_index)
+        for start, end in ranges:
+            yield parse_stars(filename, start, end)
+        return
+
+    with multiprocessing.Pool(workers, initializer=set_indexes,
+                              initargs=(graph.person_index, graph.movie_index)) as pool:
+        yield from pool.imap(parse_range, [(filename, start, end) for start, end in ranges])
+
+
+def set_indexes(people, movies):
+    """
+    Worker initializer: remember the ID lookups for parsing stars.
+    """
+    global person_index, movie_index
+    person_index = people
+    movie_index = movies
+
+
+def parse_range(task):
+    """
+    Worker entry point parsing one (filename, start, end) byte range.
+    """
+    return parse_stars(*task)
+
+
+def parse_stars(filename, start, end):
+    """
+    Returns (people, movies, rows) for the lines of stars.csv that start
+    inside [start, end): the interned edges as array bytes, skipping rows
+    that refer to unknown people or movies, and the number of rows read.
+    """
+    people = array("i")
+    movies = array("i")
+    with open(filename, "rb") as f:
+        block = read_range(f, start, end)
+    lines = block.decode("utf-8").splitlines()
+    if start == 0:
+        lines = lines[1:]
+    for line in lines:
+        person_id, _, movie_id = line.partition(",")
+        person = person_index.get(person_id.strip('"'))
+        movie = movie_index.get(movie_id.strip('"'))
+        if person is not None and movie is not None:
+            people.append(person)
+            movies.append(movie)
+    return people.tobytes(), movies.tobytes(), len(lines)
+
+
+def read_range(f, start, end):
+    """
+    Returns the bytes of every line starting inside [start, end).
+    """
+    # A line belongs to the range it starts in, so skip the tail
+    # of a line that started before this range
+    if start > 0:
+        f.seek(start - 1)
+        f.readline()
+        start = f.tell()
+    if start >= end:
+        return b""
+    block = f.read(end - start)
+    if block and not block.endswith(b"\n"):
+        block += f.readline()
+    return block
+
+
+def split_ranges(filename, chunk_size):
+    """
+    Returns (start, end) byte ranges of about chunk_size covering a file.
+    """
+    size = os.path.getsize(filename)
+    return [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)] or [(0, 0)]
+
+
+def read_rows(block):
+    """
+    Yields the non-empty CSV rows of a block, splitting lines
+    only on newlines as csv.DictReader does.
+    """
+    for row in csv.reader(io.StringIO(block.decode("utf-8"), newline="")):
+        if row:
+            yield row
+
+
+def read_chunks(filename, chunk_size, header=False):
+    """
+    Yields blocks of about chunk_size bytes ending on line
+    boundaries, optionally without the first (header) line.
+    """
+    with open(filename, "rb") as f:
+        if header:
+            f.readline()
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                return
+            if not block.endswith(b"\n"):
+                block += f.readline()
+            yield block
+
+
+def log(report, message):
+    if report is not None:
+        print(message, file=report, flush=True)
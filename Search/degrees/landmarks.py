@@ -0,0 +1,95 @@
+import math
+from array import array
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+
+
+class Landmarks():
+    """
+    Precomputed breadth-first distances from a few landmark people,
+    giving the admissible ALT lower bound
+
+        h(p, t) = max over landmarks l of |d(l, p) - d(l, t)|
+
+    which follows from the triangle inequality on the cast graph.
+    """
+
+    def __init__(self, graph, count=8):
+        self.graph = graph
+        self.people = []
+        self.distances = []
+        if len(graph.person_ids) == 0:
+            return
+
+        # Start from the person in the most movies, then repeatedly add
+        # the person farthest from every landmark chosen so far
+        degrees = [
+            graph.person_offsets[p + 1] - graph.person_offsets[p]
+            for p in range(len(graph.person_ids))
+        ]
+        person = max(range(len(degrees)), key=degrees.__getitem__)
+        nearest = array("H", [UNREACHABLE]) * len(graph.person_ids)
+        for _ in range(count):
+            distances = bfs_distances(graph, person)
+            self.people.append(person)
+            self.distances.append(distances)
+
+            best, person = 0, None
+            for p, distance in enumerate(distances):
+                if distance < nearest[p]:
+                    nearest[p] = distance
+                if nearest[p] != UNREACHABLE and nearest[p] > best:
+                    best, person = nearest[p], p
+            if person is None:
+                break
+
+    def bound_for(self, target):
+        """
+        Returns a function computing the lower bound on the distance
+        from a person to target, in O(k) per call.
+        """
+        ends = [(distances, distances[target]) for distances in self.distances]
+
+        def bound(person):
+            best = 0
+            for distances, end in ends:
+                start = distances[person]
+                if start == UNREACHABLE or end == UNREACHABLE:
+                    # A landmark reaching only one of them means the
+                    # two people lie in different components
+                    if start != end:
+                        return math.inf
+                    continue
+                difference = start - end if start > end else end - start
+                if difference > best:
+                    best = difference
+            return best
+
+        return bound
+
+
+def bfs_distances(graph, source):
+    """
+    Returns an array of breadth-first distances in people-hops from
+    source to every person, visiting each movie at most once.
+    """
+    distances = array("H", [UNREACHABLE]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    distances[source] = 0
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for person in frontier:
+            for movie in graph.movies_for_person(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in graph.stars_for_movie(movie):
+                    if distances[star] == UNREACHABLE:
+                        distances[star] = depth
+                        next_frontier.append(star)
+        frontier = next_frontier
+    return distances
@@ -0,0 +1,132 @@
+import bisect
+from array import array
+from collections import Counter
+
+# Candidates for fuzzy matches must appear in the postings of at least
+# SHARED of the PROBES rarest query trigrams, or fewer on short queries.
+# One edit changes at most EDITED of the query's trigrams, including any
+# that no name contains, so search() asks no more than a name within one
+# edit of the query is sure to share.
+PROBES = 5
+SHARED = 2
+EDITED = 3
+
+
+class NameIndex():
+    """
+    Index of lowercase person names supporting exact, prefix and fuzzy
+    lookups without scanning every name.
+
+    keys holds the names in sorted order (the prefix array) and people
+    the person index each key belongs to. The trigram inverted index is
+    stored CSR-style: the positions in keys of names containing
+    trigram_keys[i] are trigram_postings[trigram_offsets[i]:trigram_offsets[i + 1]].
+    """
+
+    def __init__(self, keys, people, trigram_keys, trigram_offsets, trigram_postings):
+        self.keys = keys
+        self.people = people
+        self.trigram_keys = trigram_keys
+        self.trigram_offsets = trigram_offsets
+        self.trigram_postings = trigram_postings
+
+    @classmethod
+    def build(cls, names):
+        """
+        Build an index over a list of names, where the
+        person index of names[i] is i.
+        """
+        lowered = [name.lower() for name in names]
+        order = sorted(range(len(lowered)), key=lowered.__getitem__)
+        keys = [lowered[person] for person in order]
+
+        postings = {}
+        for position, key in enumerate(keys):
+            for trigram in trigrams(key):
+                postings.setdefault(trigram, array("i")).append(position)
+
+        trigram_keys = sorted(postings)
+        trigram_offsets = array("q", [0])
+        trigram_postings = array("i")
+        for trigram in trigram_keys:
+            trigram_postings.extend(postings[trigram])
+            trigram_offsets.append(len(trigram_postings))
+
+        return cls(keys, array("i", order), trigram_keys, trigram_offsets, trigram_postings)
+
+    def get(self, name, default=None):
+        """
+        Returns the list of people with exactly this (lowercase) name.
+        """
+        start = bisect.bisect_left(self.keys, name)
+        end = bisect.bisect_right(self.keys, name, lo=start)
+        if start == end:
+            return default
+        return list(self.people[start:end])
+
+    def prefix(self, text, limit=None):
+        """
+        Returns the positions in keys of names starting with text.
+        """
+        start = bisect.bisect_left(self.keys, text)
+        end = start
+        while end < len(self.keys) and self.keys[end].startswith(text):
+            if limit is not None and end - start >= limit:
+                break
+            end += 1
+        return range(start, end)
+
+    def postings(self, trigram):
+        """
+        Returns the positions in keys of names containing trigram.
+        """
+        i = bisect.bisect_left(self.trigram_keys, trigram)
+        if i == len(self.trigram_keys) or self.trigram_keys[i] != trigram:
+            return self.trigram_postings[0:0]
+        return self.trigram_postings[self.trigram_offsets[i]:self.trigram_offsets[i + 1]]
+
+    def search(self, text, limit=10):
+        """
+        Returns up to limit (score, person) pairs for names resembling
+        text, best first. A prefix match scores the fraction of the name
+        it covers (1.0 when exact); other names score the Jaccard
+        similarity of their trigrams with the query's. Fuzzy matching is
+        skipped when prefix matches alone fill the limit.
+        """
+        text = text.lower().strip()
+        if not text:
+            return []
+        scores = {}
+
+        for position in self.prefix(text, limit):
+            scores[position] = len(text) / len(self.keys[position])
+
+        if len(scores) < limit:
+            # Propose candidates from the rarest trigrams only, then score
+            # each against the full trigram set of the query
+            wanted = trigrams(text)
+            lists = sorted((self.postings(trigram) for trigram in wanted), key=len)
+            unknown = sum(1 for postings in lists if not len(postings))
+            lists = [postings for postings in lists if len(postings)][:PROBES]
+            counts = Counter()
+            for postings in lists:
+                counts.update(postings)
+            needed = max(1, min(SHARED, len(lists) - max(0, EDITED - unknown)))
+            for position, count in counts.items():
+                if count < needed or position in scores:
+                    continue
+                found = trigrams(self.keys[position])
+                shared = len(wanted & found)
+                scores[position] = shared / (len(wanted) + len(found) - shared)
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(score, self.people[position]) for position, score in best]
+
+
+def trigrams(text):
+    """
+    Returns the set of character trigrams of text,
+    padded so word boundaries count.
+    """
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
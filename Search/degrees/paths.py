@@ -0,0 +1,278 @@
+import heapq
+import itertools
+
+
+class PathDAG():
+    """
+    Every shortest path from source to target, stored as a predecessor
+    DAG: predecessors[node] lists the (action, previous node) steps that
+    lie on some shortest path. Paths are enumerated lazily from it.
+    """
+
+    def __init__(self, source, target, length, predecessors):
+        self.source = source
+        self.target = target
+        self.length = length
+        self.predecessors = predecessors
+
+    def count(self):
+        """
+        Returns the number of shortest paths without enumerating them.
+        """
+        counts = {self.source: 1}
+
+        def paths_to(node):
+            if node not in counts:
+                counts[node] = sum(paths_to(previous) for _, previous in self.predecessors[node])
+            return counts[node]
+
+        # Settle nodes in order of distance so recursion stays shallow
+        for node in self.nodes_by_distance():
+            paths_to(node)
+        return paths_to(self.target)
+
+    def nodes_by_distance(self):
+        """
+        Returns the nodes of the DAG ordered from source to target.
+        """
+        order = []
+        seen = {self.target}
+        level = [self.target]
+        while level:
+            order.append(level)
+            next_level = []
+            for node in level:
+                for _, previous in self.predecessors.get(node, []):
+                    if previous not in seen:
+                        seen.add(previous)
+                        next_level.append(previous)
+            level = next_level
+        return [node for level in reversed(order) for node in level]
+
+    def paths(self):
+        """
+        Yields each shortest path as a list of (action, node) pairs,
+        walking back from the target one path at a time.
+        """
+        if self.length is None:
+            return
+        if self.length == 0:
+            yield []
+            return
+
+        # Each stack entry is (node, index of the next predecessor to try)
+        steps = []
+        stack = [(self.target, 0)]
+        while stack:
+            node, i = stack.pop()
+            if node == self.source:
+                yield [step for step in reversed(steps)]
+                steps.pop()
+                continue
+            predecessors = self.predecessors[node]
+            if i == len(predecessors):
+                # Every way into this node is done; step back out of it
+                if steps:
+                    steps.pop()
+                continue
+            action, previous = predecessors[i]
+            stack.append((node, i + 1))
+            steps.append((action, node))
+            stack.append((previous, 0))
+
+
+def shortest_path_dag(source, target, neighbors):
+    """
+    Returns a PathDAG holding every shortest path from source to target.
+
+    Breadth-first search runs from both ends, always growing the smaller
+    frontier by one whole level and recording every parent that reaches
+    a node at its level. The level in which the sides meet holds all the
+    edges where shortest paths cross from one side to the other.
+    """
+    if source == target:
+        return PathDAG(source, target, 0, {})
+
+    depths = [{source: 0}, {target: 0}]
+    parents = [{source: []}, {target: []}]
+    frontiers = [[source], [target]]
+    levels = [0, 0]
+
+    crossings = []
+    while frontiers[0] and frontiers[1] and not crossings:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own_depths, other_depths = depths[side], depths[1 - side]
+        own_parents = parents[side]
+        level = levels[side] + 1
+
+        next_frontier = []
+        for node in frontiers[side]:
+            for action, neighbor in neighbors(node):
+                if neighbor in other_depths:
+                    crossings.append((node, action, neighbor) if side == 0 else (neighbor, action, node))
+                    continue
+                if neighbor not in own_depths:
+                    own_depths[neighbor] = level
+                    own_parents[neighbor] = []
+                    next_frontier.append(neighbor)
+                if own_depths[neighbor] == level:
+                    own_parents[neighbor].append((action, node))
+        frontiers[side] = next_frontier
+        levels[side] = level
+
+    if not crossings:
+        return PathDAG(source, target, None, {})
+
+    # Keep only the parts of each side's BFS that lead to a crossing
+    predecessors = {}
+    forward = []
+    backward = []
+    for before, action, after in crossings:
+        if after not in predecessors:
+            predecessors[after] = []
+            backward.append(after)
+        predecessors[after].append((action, before))
+        forward.append(before)
+
+    seen = set(forward)
+    while forward:
+        node = forward.pop()
+        predecessors[node] = parents[0][node]
+        for _, previous in parents[0][node]:
+            if previous not in seen:
+                seen.add(previous)
+                forward.append(previous)
+
+    seen = set(backward)
+    while backward:
+        node = backward.pop()
+        for action, following in parents[1][node]:
+            predecessors.setdefault(following, []).append((action, node))
+            if following not in seen:
+                seen.add(following)
+                backward.append(following)
+
+    length = depths[0][crossings[0][0]] + 1 + depths[1][crossings[0][2]]
+    return PathDAG(source, target, length, predecessors)
+
+
+def all_shortest_paths(source, target, neighbors):
+    """
+    Yields every shortest path from source to target
+    as a list of (action, node) pairs.
+    """
+    yield from shortest_path_dag(source, target, neighbors).paths()
+
+
+def k_shortest_paths(source, target, neighbors):
+    """
+    Yields loopless paths from source to target in order of length
+    using Yen's algorithm; stop iterating after as many as needed.
+
+    The search runs on the bipartite graph of nodes and the actions
+    joining them, so a path never takes the same action twice and
+    banning an action from a spur search bans it everywhere.
+    """
+    graph = ActionGraph(neighbors)
+    goal = (NODE, target)
+    first = graph.shortest_path((NODE, source), goal, set(), set())
+    if first is None:
+        return
+    found = [first]
+    yield graph.steps(first)
+
+    # Candidate paths as (length, insertion order, path)
+    candidates = []
+    order = itertools.count()
+    seen = {tuple(first)}
+
+    while True:
+        previous = found[-1]
+        for i in range(len(previous) - 1):
+            spur, root = previous[i], previous[:i + 1]
+
+            # Ban the next step of every found path sharing this root,
+            # and every node of the root before the spur
+            banned_edges = set()
+            for path in found:
+                if len(path) > i + 1 and path[:i + 1] == root:
+                    banned_edges.add((spur, path[i + 1]))
+            banned_nodes = set(previous[:i])
+
+            spur_path = graph.shortest_path(spur, goal, banned_nodes, banned_edges)
+            if spur_path is not None:
+                path = root[:-1] + spur_path
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heapq.heappush(candidates, (len(path), next(order), path))
+
+        if not candidates:
+            return
+        _, _, path = heapq.heappop(candidates)
+        found.append(path)
+        yield graph.steps(path)
+
+
+# Kinds of vertex in an ActionGraph
+NODE = 0
+ACTION = 1
+
+
+class ActionGraph():
+    """
+    The bipartite graph behind a neighbors(node) function, with a vertex
+    (NODE, node) for each node and (ACTION, action) for each action that
+    joins several of them. The members of an action are learned from the
+    neighbors of the first node that reaches it.
+    """
+
+    def __init__(self, neighbors):
+        self.neighbors = neighbors
+        self.members = {}
+
+    def adjacent(self, vertex):
+        kind, value = vertex
+        if kind == ACTION:
+            return [(NODE, node) for node in self.members[value]]
+        actions = {}
+        for action, neighbor in self.neighbors(value):
+            if action not in actions:
+                actions[action] = None
+                self.members.setdefault(action, {value: None})
+            self.members[action][neighbor] = None
+        return [(ACTION, action) for action in actions]
+
+    def shortest_path(self, start, goal, banned_vertices, banned_edges):
+        """
+        Returns the vertices of a shortest path from start to goal found
+        by breadth-first search, avoiding banned vertices and (vertex,
+        next vertex) edges, or None if there is none.
+        """
+        parents = {start: None}
+        frontier = [start]
+        while frontier and goal not in parents:
+            next_frontier = []
+            for vertex in frontier:
+                for neighbor in self.adjacent(vertex):
+                    if (neighbor in parents or neighbor in banned_vertices
+                            or (vertex, neighbor) in banned_edges):
+                        continue
+                    parents[neighbor] = vertex
+                    next_frontier.append(neighbor)
+            frontier = next_frontier
+
+        if goal not in parents:
+            return None
+        path = []
+        vertex = goal
+        while vertex is not None:
+            path.append(vertex)
+            vertex = parents[vertex]
+        path.reverse()
+        return path
+
+    def steps(self, path):
+        """
+        Returns a path of vertices as a list of (action, node) pairs.
+        """
+        return [(action, node) for (_, action), (_, node) in zip(path[1::2], path[2::2])]
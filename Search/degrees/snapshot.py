@@ -0,0 +1,313 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+
+from graph import CSRGraph
+from nameindex import NameIndex
+
+MAGIC = b"DEGREES\0"
+VERSION = 2
+
+# Magic, version and header length, followed by a JSON header
+PREAMBLE = struct.Struct("<8sII")
+
+# CSV files a snapshot is built from
+SOURCES = ["people.csv", "movies.csv", "stars.csv"]
+
+# Graph attributes stored as lists of strings
+STRINGS = [
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years"
+]
+
+# Graph attributes stored as integer arrays
+ARRAYS = {
+    "person_offsets": "q",
+    "person_movies": "i",
+    "movie_offsets": "q",
+    "movie_stars": "i"
+}
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as an offsets array
+    and a UTF-8 blob, decoding entries on access.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.raw(i).decode("utf-8")
+
+    def raw(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+
+class SortedKeys():
+    """
+    Sequence view of a StringTable in the order given by a permutation,
+    so the stored keys can be searched with bisect.
+    """
+
+    def __init__(self, table, order):
+        self.table = table
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, i):
+        return self.table.raw(self.order[i])
+
+
+class SortedIndex():
+    """
+    Maps string keys to dense indices by binary search over a sorted
+    permutation, standing in for the dicts of an in-memory graph.
+    """
+
+    def __init__(self, table, order):
+        self.keys = SortedKeys(table, order)
+        self.order = order
+
+    def __getitem__(self, key):
+        index = self.get(key)
+        if index is None:
+            raise KeyError(key)
+        return index
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        key = key.encode("utf-8")
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.order[i]
+        return default
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot for a data directory.
+    """
+    return os.path.join(directory, "degrees.snapshot")
+
+
+def fingerprint(directory):
+    """
+    Returns the size, mtime and SHA-256 of each source CSV.
+    """
+    result = {}
+    for name in SOURCES:
+        filename = os.path.join(directory, name)
+        stat = os.stat(filename)
+        result[name] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_hash(filename)
+        }
+    return result
+
+
+def file_hash(filename):
+    """
+    Returns the hex SHA-256 digest of a file.
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_fresh(sources, directory):
+    """
+    Returns True if the recorded sources still match the CSVs on disk.
+    A changed mtime alone only triggers a hash comparison; when the
+    hash still matches, the new mtime is written into sources.
+    """
+    for name in SOURCES:
+        recorded = sources.get(name)
+        if recorded is None:
+            return False
+        try:
+            stat = os.stat(os.path.join(directory, name))
+        except OSError:
+            return False
+        if stat.st_size != recorded["size"]:
+            return False
+        if stat.st_mtime_ns != recorded["mtime_ns"]:
+            if file_hash(os.path.join(directory, name)) != recorded["sha256"]:
+                return False
+            recorded["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def update_header(path, header, length):
+    """
+    Rewrite the JSON header of the snapshot at path in place, padded
+    with spaces to its old length. Does nothing if it no longer fits
+    or the snapshot cannot be written.
+    """
+    data = json.dumps(header).encode("utf-8")
+    if len(data) > length:
+        return
+    try:
+        with open(path, "r+b") as f:
+            f.seek(PREAMBLE.size)
+            f.write(data.ljust(length))
+    except OSError:
+        pass
+
+
+def save_snapshot(graph, directory, path=None):
+    """
+    Write graph to a versioned binary snapshot next to the CSVs in
+    directory, recording their fingerprints for later invalidation.
+    """
+    path = path or snapshot_path(directory)
+    sections = {}
+
+    for name, typecode in ARRAYS.items():
+        sections[name] = array(typecode, getattr(graph, name)).tobytes()
+
+    for name in STRINGS:
+        offsets, blob = encode_strings(getattr(graph, name))
+        sections[f"{name}.offsets"] = offsets
+        sections[f"{name}.blob"] = blob
+
+    # Permutations that sort IDs, for lookups by binary search
+    for kind in ["person", "movie"]:
+        ids = [value.encode("utf-8") for value in getattr(graph, f"{kind}_ids")]
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        sections[f"{kind}_order"] = array("i", order).tobytes()
+
+    # Sorted lowercase names and their trigram inverted index
+    index = graph.name_index
+    for name in ["keys", "trigram_keys"]:
+        offsets, blob = encode_strings(getattr(index, name))
+        sections[f"name_{name}.offsets"] = offsets
+        sections[f"name_{name}.blob"] = blob
+    sections["name_people"] = array("i", index.people).tobytes()
+    sections["name_trigram_offsets"] = array("q", index.trigram_offsets).tobytes()
+    sections["name_trigram_postings"] = array("i", index.trigram_postings).tobytes()
+
+    # Lay out sections on 8-byte boundaries after the header
+    layout = {}
+    position = 0
+    for name, data in sections.items():
+        layout[name] = [position, len(data)]
+        position += align(len(data))
+    header = json.dumps({
+        "sources": fingerprint(directory),
+        "sections": layout
+    }).encode("utf-8")
+    base = align(PREAMBLE.size + len(header))
+
+    # Write to a temporary file so readers never see a partial snapshot
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        f.write(bytes(base - PREAMBLE.size - len(header)))
+        for data in sections.values():
+            f.write(data)
+            f.write(bytes(align(len(data)) - len(data)))
+    os.replace(temporary, path)
+    return path
+
+
+def load_snapshot(directory, path=None):
+    """
+    Memory-map the snapshot for directory and return a CSRGraph backed
+    by it, or None if there is no snapshot or it is out of date.
+    """
+    path = path or snapshot_path(directory)
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+
+    with f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) != PREAMBLE.size:
+            return None
+        magic, version, length = PREAMBLE.unpack(preamble)
+        if magic != MAGIC or version != VERSION:
+            return None
+        # The header may be mid-rewrite by another process, or corrupt;
+        # either way fall back to the CSVs
+        try:
+            header = json.loads(f.read(length))
+            mtimes = [source["mtime_ns"] for source in header["sources"].values()]
+            if not isinstance(header["sections"], dict):
+                return None
+            if not is_fresh(header["sources"], directory):
+                return None
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+        # Record mtimes of touched but unchanged CSVs, so later
+        # startups need not hash them again
+        if mtimes != [source["mtime_ns"] for source in header["sources"].values()]:
+            update_header(path, header, length)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    base = align(PREAMBLE.size + length)
+    view = memoryview(mapped)
+
+    def section(name, typecode="B"):
+        start, size = header["sections"][name]
+        return view[base + start:base + start + size].cast(typecode)
+
+    def strings(name):
+        return StringTable(section(f"{name}.offsets", "q"), section(f"{name}.blob"))
+
+    graph = CSRGraph()
+    for name, typecode in ARRAYS.items():
+        setattr(graph, name, section(name, typecode))
+    for name in STRINGS:
+        setattr(graph, name, strings(name))
+    graph.person_index = SortedIndex(graph.person_ids, section("person_order", "i"))
+    graph.movie_index = SortedIndex(graph.movie_ids, section("movie_order", "i"))
+    graph.name_index = NameIndex(
+        strings("name_keys"), section("name_people", "i"),
+        strings("name_trigram_keys"), section("name_trigram_offsets", "q"),
+        section("name_trigram_postings", "i")
+    )
+
+    # Keep the mapping alive for as long as the graph is
+    graph.mapping = mapped
+    return graph
+
+
+def encode_strings(values):
+    """
+    Returns (offsets, blob) bytes for a sequence of strings or bytes.
+    """
+    offsets = array("q", [0])
+    blob = bytearray()
+    for value in values:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        blob += value
+        offsets.append(len(blob))
+    return offsets.tobytes(), bytes(blob)
+
+
+def align(size):
+    """
+    Round size up to a multiple of 8 bytes.
+    """
+    return (size + 7) & ~7
@@ -1,3 +1,8 @@
+import heapq
+import itertools
+from collections import Counter, deque
+
+
 class Node():
     def __init__(self, state, parent, action, cost=0):
         self.state = state
@@ -18,11 +23,16 @@ class StackFrontier():
     def __init__(self):
         self.frontier = []
 
+        # Number of nodes in the frontier holding each state,
+        # so membership tests do not scan the frontier
+        self.states = Counter()
+
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] += 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -31,17 +41,75 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard(node.state)
             return node
 
+    def discard(self, state):
+        self.states[state] -= 1
+        if self.states[state] == 0:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
 
+    def __init__(self):
+        super().__init__()
+        self.frontier = deque()
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard(node.state)
             return node
+
+
+class PriorityFrontier():
+    """
+    Frontier that removes the node with the lowest priority first.
+    Each state is held at most once: adding a state again with a lower
+    priority replaces the old entry, which is left in the heap and
+    skipped when popped (lazy deletion).
+    """
+
+    def __init__(self):
+        self.frontier = []
+        self.entries = {}
+        self.order = itertools.count()
+
+    def add(self, node, priority=None):
+        """
+        Add node with the given priority (its cost by default). Returns
+        False if its state is already held with a priority no higher.
+        """
+        if priority is None:
+            priority = node.cost
+        entry = self.entries.get(node.state)
+        if entry is not None:
+            if entry[0] <= priority:
+                return False
+            entry[2] = None
+        entry = [priority, next(self.order), node]
+        self.entries[node.state] = entry
+        heapq.heappush(self.frontier, entry)
+        return True
+
+    def contains_state(self, state):
+        return state in self.entries
+
+    def priority(self, state):
+        entry = self.entries.get(state)
+        return entry[0] if entry is not None else None
+
+    def empty(self):
+        return len(self.entries) == 0
+
+    def remove(self):
+        while self.frontier:
+            _, _, node = heapq.heappop(self.frontier)
+            if node is not None:
+                del self.entries[node.state]
+                return node
+        raise Exception("empty frontier")
@@ -0,0 +1,157 @@
+import sys
+
+import numpy as np
+
+from maze import read_walls
+
+# Moves in the order Maze.neighbors lists them
+ACTIONS = ["up", "down", "left", "right"]
+
+
+class GridMaze():
+    """
+    Maze whose walls are a NumPy boolean array (one byte per cell),
+    solved by a breadth-first wavefront that expands whole frontiers
+    with array operations.
+    """
+
+    def __init__(self, walls, start, goal):
+        self.walls = np.asarray(walls, dtype=bool)
+        self.height, self.width = self.walls.shape
+        self.start = start
+        self.goal = goal
+        self.solution = None
+        self.distances = None
+        self.num_explored = 0
+
+    @classmethod
+    def from_file(cls, filename, endpoints=True):
+        """
+        Read a maze in the same text format as maze.py.
+        """
+        # Stream the file with maze.py's loader and view its wall bytes
+        walls, start, goal = read_walls(filename, endpoints)
+        cells = np.frombuffer(walls.cells, dtype=np.uint8).reshape(walls.height, walls.width)
+        return cls(cells != 0, start, goal)
+
+    @classmethod
+    def random(cls, height, width, density=0.3, seed=None):
+        """
+        Generate a random maze with the given fraction of wall cells,
+        its start in the top-left corner and its goal in the bottom-right.
+        """
+        rng = np.random.default_rng(seed)
+        walls = rng.random((height, width)) < density
+        walls[0, 0] = walls[-1, -1] = False
+        return cls(walls, (0, 0), (height - 1, width - 1))
+
+    def padded(self):
+        """
+        Returns a flat array of open cells with a one-cell wall border,
+        so neighbor indices never leave the grid, and its row stride.
+        """
+        open_cells = np.zeros((self.height + 2, self.width + 2), dtype=bool)
+        open_cells[1:-1, 1:-1] = ~self.walls
+        return open_cells.ravel(), self.width + 2
+
+    def distance_field(self, sources, stop=None):
+        """
+        Returns an int32 array of breadth-first distances from the nearest
+        of sources to every cell (-1 where unreachable). Each step expands
+        the whole frontier at once; if stop is given, the sweep ends once
+        that cell has been reached.
+        """
+        open_cells, stride = self.padded()
+        flat = lambda cell: (cell[0] + 1) * stride + cell[1] + 1
+        stop = flat(stop) if stop is not None else None
+        distances = sweep(open_cells, stride, [flat(cell) for cell in sources], stop)
+        return distances.reshape(self.height + 2, self.width + 2)[1:-1, 1:-1]
+
+    def distance_fields(self, goals):
+        """
+        Returns a (len(goals), height, width) array holding a separate
+        distance field for each goal. All of them come from one sweep
+        over stacked copies of the maze, whose borders keep the copies
+        apart, so each level is a single set of array operations.
+        """
+        open_cells, stride = self.padded()
+        size = open_cells.size
+        flat = lambda cell: (cell[0] + 1) * stride + cell[1] + 1
+        layers = np.tile(open_cells, len(goals))
+        distances = sweep(layers, stride, [i * size + flat(goal) for i, goal in enumerate(goals)])
+        return distances.reshape(len(goals), self.height + 2, self.width + 2)[:, 1:-1, 1:-1]
+
+    def solve(self):
+        """
+        Finds a shortest solution to the maze, if one exists.
+        """
+        # Sweep outward from the goal, then walk downhill from the start
+        self.distances = self.distance_field([self.goal], stop=self.start)
+        self.num_explored = int(np.count_nonzero(self.distances >= 0))
+        path = descend(self.distances, self.start)
+        if path is None:
+            raise Exception("no solution")
+        self.solution = path
+
+
+def sweep(open_cells, stride, sources, stop=None):
+    """
+    Returns breadth-first distances over a flat padded array of open
+    cells from the nearest of the flat indices in sources (-1 where
+    unreachable), stopping early once index stop has been reached.
+    """
+    offsets = np.array([-stride, stride, -1, 1])
+    distances = np.full(open_cells.size, -1, dtype=np.int32)
+    frontier = np.unique(np.array(sources, dtype=np.int64))
+    distances[frontier] = 0
+
+    # A cell reached twice in one level is kept only where the scratch
+    # array still names it, which removes duplicates without sorting
+    owner = np.empty(open_cells.size, dtype=np.int32)
+
+    level = 0
+    while len(frontier) and (stop is None or distances[stop] < 0):
+        level += 1
+        candidates = (frontier[:, None] + offsets).ravel()
+        candidates = candidates[open_cells[candidates] & (distances[candidates] < 0)]
+        positions = np.arange(len(candidates), dtype=np.int32)
+        owner[candidates] = positions
+        frontier = candidates[owner[candidates] == positions]
+        distances[frontier] = level
+    return distances
+
+
+def descend(distances, start):
+    """
+    Returns (actions, cells) leading from start to the cell at
+    distance 0 by always stepping to a neighbor one closer,
+    or None if start was not reached.
+    """
+    height, width = distances.shape
+    row, col = start
+    remaining = int(distances[row, col])
+    if remaining < 0:
+        return None
+
+    actions = []
+    cells = []
+    while remaining > 0:
+        for action, (r, c) in zip(ACTIONS, [(row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)]):
+            if 0 <= r < height and 0 <= c < width and distances[r, c] == remaining - 1:
+                row, col = r, c
+                break
+        actions.append(action)
+        cells.append((row, col))
+        remaining -= 1
+    return actions, cells
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python grid.py maze.txt")
+
+    m = GridMaze.from_file(sys.argv[1])
+    print("Solving...")
+    m.solve()
+    print("States Explored:", m.num_explored)
+    print("Solution length:", len(m.solution[0]))
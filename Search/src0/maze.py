@@ -1,21 +1,34 @@
+import heapq
+import itertools
 import sys
+import time
+from array import array
+from collections import Counter, deque
+
+import numpy as np
 
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
 
 
 class StackFrontier():
     def __init__(self):
         self.frontier = []
 
+        # Number of nodes in the frontier holding each state,
+        # so membership tests do not scan the frontier
+        self.states = Counter()
+
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] += 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,80 +37,226 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard(node.state)
             return node
 
+    def discard(self, state):
+        self.states[state] -= 1
+        if self.states[state] == 0:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
 
+    def __init__(self):
+        super().__init__()
+        self.frontier = deque()
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard(node.state)
             return node
 
-class Maze():
 
-    def __init__(self, filename):
+class PriorityFrontier():
+    """
+    Frontier that removes the node with the lowest priority first,
+    and among equal priorities the one with the highest cost, which
+    for A* is the one nearest the goal. Each state is held at most
+    once: adding a state again with a lower priority replaces the old
+    entry, which is left in the heap and skipped when popped (lazy
+    deletion).
+    """
 
-        # Read file and set height and width of maze
-        with open(filename) as f:
-            contents = f.read()
+    def __init__(self):
+        self.frontier = []
+        self.entries = {}
+        self.order = itertools.count()
+
+    def add(self, node, priority=None):
+        if priority is None:
+            priority = node.cost
+        entry = self.entries.get(node.state)
+        if entry is not None:
+            if entry[0] <= priority:
+                return False
+            entry[3] = None
+        entry = [priority, -node.cost, next(self.order), node]
+        self.entries[node.state] = entry
+        heapq.heappush(self.frontier, entry)
+        return True
 
-        # Validate start and goal
-        if contents.count("A") != 1:
-            raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
-            raise Exception("maze must have exactly one goal")
+    def contains_state(self, state):
+        return state in self.entries
 
-        # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
+    def empty(self):
+        return len(self.entries) == 0
 
-        # Keep track of walls
-        self.walls = []
+    def remove(self):
+        while self.frontier:
+            *_, node = heapq.heappop(self.frontier)
+            if node is not None:
+                del self.entries[node.state]
+                return node
+        raise Exception("empty frontier")
+
+
+def manhattan(state, goal):
+    """Number of moves between two cells if there were no walls."""
+    return abs(state[0] - goal[0]) + abs(state[1] - goal[1])
+
+
+# Search strategies accepted by Maze.solve
+STRATEGIES = ["dfs", "bfs", "astar", "weighted", "greedy", "jps"]
+
+# Kinds of cell when drawing a maze, with their colour and character
+EMPTY, WALL, START, GOAL, SOLUTION, EXPLORED, BORDER = range(7)
+COLORS = np.array([
+    (237, 240, 252),
+    (40, 40, 40),
+    (255, 0, 0),
+    (0, 171, 28),
+    (220, 235, 113),
+    (212, 97, 85),
+    (0, 0, 0)
+], dtype=np.uint8)
+SYMBOLS = np.array([ord(c) for c in " █AB*  "], dtype="<u4")
+
+# Row and column step of each move
+DIRECTIONS = {
+    "up": (-1, 0),
+    "down": (1, 0),
+    "left": (0, -1),
+    "right": (0, 1)
+}
+
+class Walls():
+    """
+    Wall flags of a maze stored row after row in a bytearray, one byte
+    per cell, so walls[i][j] is nonzero where cell (i, j) is a wall.
+    """
+
+    def __init__(self, cells, height, width):
+        self.cells = cells
+        self.height = height
+        self.width = width
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.height:
+            raise IndexError("row out of range")
+        return memoryview(self.cells)[i * self.width:(i + 1) * self.width]
+
+    def __iter__(self):
         for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+            yield self[i]
+
+
+# Maps each byte of a maze file to 1 for a wall and 0 for open space
+WALL_BYTES = bytes(0 if chr(b) in " AB" else 1 for b in range(256))
+
+
+def read_walls(filename, endpoints=True):
+    """
+    Returns (walls, start, goal) for a maze file, read one line at a
+    time so the text is never held in memory. Rows shorter than the
+    longest are padded with open space. If endpoints is false the file
+    is just a layout: A and B are optional, and start and goal are None
+    unless exactly one of each is present.
+    """
+    cells = bytearray()
+    ends = array("q")
+    height = 0
+    width = 0
+    starts = []
+    goals = []
+
+    with open(filename, "rb") as f:
+        for line in f:
+            line = line.rstrip(b"\r\n")
+
+            # Non-ASCII characters are one cell each, however many bytes
+            text = line.decode("utf-8")
+            if line.isascii():
+                row = line.translate(WALL_BYTES)
+            else:
+                row = bytes(0 if c in " AB" else 1 for c in text)
+
+            for c, found in (("A", starts), ("B", goals)):
+                if c in text:
+                    found.extend((height, j) for j, x in enumerate(text) if x == c)
+
+            # Rows are kept unpadded until the widest is known
+            cells.extend(row)
+            ends.append(len(cells))
+            width = max(width, len(row))
+            height += 1
+
+    if endpoints and len(starts) != 1:
+        raise Exception("maze must have exactly one start point")
+    if endpoints and len(goals) != 1:
+        raise Exception("maze must have exactly one goal")
+
+    # Pad short rows in one pass, unless the maze is already rectangular
+    if len(cells) != height * width:
+        padded = bytearray(height * width)
+        begin = 0
+        for i, end in enumerate(ends):
+            padded[i * width:i * width + end - begin] = cells[begin:end]
+            begin = end
+        cells = padded
+
+    start = starts[0] if len(starts) == 1 else None
+    goal = goals[0] if len(goals) == 1 else None
+    return Walls(cells, height, width), start, goal
+
 
+class Maze():
+
+    def __init__(self, filename):
+
+        # Stream the file into one byte per cell, finding start and goal
+        self.walls, self.start, self.goal = read_walls(filename)
+        self.height = len(self.walls)
+        self.width = self.walls.width
         self.solution = None
 
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
-        print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
-                elif (i, j) == self.start:
-                    print("A", end="")
-                elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
-                else:
-                    print(" ", end="")
-            print()
+        kinds = self.cell_kinds()
+
+        # One code point per cell plus a newline ending each row,
+        # decoded into a single string
+        codes = np.empty((self.height, self.width + 1), dtype="<u4")
+        codes[:, :-1] = SYMBOLS[kinds]
+        codes[:, -1] = ord("\n")
         print()
+        print(codes.tobytes().decode("utf-32-le"))
+
+
+    def cell_kinds(self, show_solution=True, show_explored=False):
+        """
+        Returns a height x width array holding the kind of each cell
+        (EMPTY, WALL, START, GOAL, SOLUTION or EXPLORED), as drawn.
+        """
+        kinds = np.zeros((self.height, self.width), dtype=np.uint8)
+
+        # Paint from the bottom layer up, so walls, start and goal win
+        if self.solution is not None:
+            if show_explored:
+                kinds.reshape(-1)[np.frombuffer(self.explored, dtype=np.uint8) != 0] = EXPLORED
+            if show_solution:
+                kinds.reshape(-1)[self.solution_indexes] = SOLUTION
+        kinds[self.goal] = GOAL
+        kinds[self.start] = START
+        kinds[np.frombuffer(self.walls.cells, dtype=np.uint8).reshape(self.height, self.width) != 0] = WALL
+        return kinds
 
 
     def neighbors(self, state):
@@ -111,24 +270,53 @@ class Maze():
 
         result = []
         for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
+            if 0 <= r < self.height and 0 <= c < self.width and not self.walls.cells[r * self.width + c]:
                 result.append((action, (r, c)))
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def solve(self, strategy="dfs", heuristic=manhattan, weight=2):
+        """
+        Finds a solution to maze, if one exists, using one of STRATEGIES:
+        depth-first, breadth-first, A*, weighted A* (heuristic scaled by
+        weight), greedy best-first search or jump point search.
+        heuristic(state, goal) estimates the moves left; bfs, astar and
+        jps find shortest solutions.
+        """
+        if strategy == "jps":
+            return self.solve_jps(heuristic)
 
-        # Keep track of number of states explored
+        # Keep track of number of states explored and time taken
         self.num_explored = 0
+        started = time.perf_counter()
+
+        # Priority of a node for the best-first strategies
+        if strategy == "astar":
+            priority = lambda node: node.cost + heuristic(node.state, self.goal)
+        elif strategy == "weighted":
+            priority = lambda node: node.cost + weight * heuristic(node.state, self.goal)
+        elif strategy == "greedy":
+            priority = lambda node: heuristic(node.state, self.goal)
+        elif strategy in ("dfs", "bfs"):
+            priority = None
+        else:
+            raise ValueError(f"unknown strategy: {strategy}")
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
-        frontier.add(start)
+        if strategy == "dfs":
+            frontier = StackFrontier()
+            frontier.add(start)
+        elif strategy == "bfs":
+            frontier = QueueFrontier()
+            frontier.add(start)
+        else:
+            frontier = PriorityFrontier()
+            frontier.add(start, priority(start))
 
-        # Initialize an empty explored set
-        self.explored = set()
+        # Initialize an empty explored set, one byte per cell
+        self.explored = bytearray(self.height * self.width)
+        width = self.width
 
         # Keep looping until solution found
         while True:
@@ -152,78 +340,180 @@ class Maze():
                 actions.reverse()
                 cells.reverse()
                 self.solution = (actions, cells)
+                self.solution_indexes = np.array([row * width + col for row, col in cells], dtype=np.int64)
+                self.solve_time = time.perf_counter() - started
                 return
 
             # Mark node as explored
-            self.explored.add(node.state)
+            row, col = node.state
+            self.explored[row * width + col] = 1
 
-            # Add neighbors to frontier
+            # Add neighbors to frontier; a priority frontier keeps
+            # whichever route to a state is better
             for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
+                if self.explored[state[0] * width + state[1]]:
+                    continue
+                child = Node(state=state, parent=node, action=action, cost=node.cost + 1)
+                if priority is not None:
+                    frontier.add(child, priority(child))
+                elif not frontier.contains_state(state):
                     frontier.add(child)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
-
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
-
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
-
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
-
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
-
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-
-        img.save(filename)
-
-
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+    def is_open(self, row, col):
+        return 0 <= row < self.height and 0 <= col < self.width and not self.walls.cells[row * self.width + col]
+
+
+    def solve_jps(self, heuristic=manhattan):
+        """
+        Finds a shortest solution with jump point search: A* over jump
+        points only, since most cells of an open area just continue in a
+        straight line and need not be expanded.
+
+        Of all shortest paths, only those that move horizontally before
+        vertically whenever both orders are open are considered. So a
+        vertical run may turn only at a forced neighbor (a side cell
+        whose counterpart one step back is a wall), while a horizontal
+        run may turn up or down anywhere, and stops where such a turn
+        leads to a jump point.
+        """
+        self.num_explored = 0
+        started = time.perf_counter()
+
+        start = Node(state=self.start, parent=None, action=None)
+        frontier = PriorityFrontier()
+        frontier.add(start, heuristic(self.start, self.goal))
+        self.explored = bytearray(self.height * self.width)
+        width = self.width
+
+        while True:
+            if frontier.empty():
+                raise Exception("no solution")
+
+            node = frontier.remove()
+            self.num_explored += 1
+
+            # Fill in the cells between consecutive jump points
+            if node.state == self.goal:
+                actions = []
+                cells = []
+                indexes = []
+                while node.parent is not None:
+                    row, col = node.state
+                    dr, dc = DIRECTIONS[node.action]
+                    while (row, col) != node.parent.state:
+                        actions.append(node.action)
+                        cells.append((row, col))
+                        indexes.append(row * width + col)
+                        row, col = row - dr, col - dc
+                    node = node.parent
+                actions.reverse()
+                cells.reverse()
+                self.solution = (actions, cells)
+                self.solution_indexes = np.array(indexes, dtype=np.int64)
+                self.solve_time = time.perf_counter() - started
+                return
+
+            row, col = node.state
+            self.explored[row * width + col] = 1
+
+            for action in self.jump_directions(node):
+                state = self.jump(node.state, *DIRECTIONS[action])
+                if state is None or self.explored[state[0] * width + state[1]]:
+                    continue
+                cost = node.cost + manhattan(node.state, state)
+                child = Node(state=state, parent=node, action=action, cost=cost)
+                frontier.add(child, cost + heuristic(state, self.goal))
+
+
+    def jump_directions(self, node):
+        """
+        Returns the moves worth trying from a jump point,
+        given the move that reached it.
+        """
+        if node.action is None:
+            return list(DIRECTIONS)
+        dr, dc = DIRECTIONS[node.action]
+        if dr == 0:
+            return [node.action, "up", "down"]
+
+        # Vertical runs keep going, turning only into forced neighbors
+        row, col = node.state
+        result = [node.action]
+        for action in ("left", "right"):
+            side = DIRECTIONS[action][1]
+            if self.is_open(row, col + side) and not self.is_open(row - dr, col + side):
+                result.append(action)
+        return result
+
+
+    def jump(self, state, dr, dc):
+        """
+        Returns the next jump point reached by moving from state
+        in direction (dr, dc), or None if the run is a dead end.
+        """
+        row, col = state
+        while True:
+            row, col = row + dr, col + dc
+            if not self.is_open(row, col):
+                return None
+            if (row, col) == self.goal:
+                return (row, col)
+
+            if dc == 0:
+                # Vertical: stop where a side opens up
+                for side in (-1, 1):
+                    if self.is_open(row, col + side) and not self.is_open(row - dr, col + side):
+                        return (row, col)
+            else:
+                # Horizontal: stop where turning up or down leads anywhere
+                if self.jump((row, col), -1, 0) or self.jump((row, col), 1, 0):
+                    return (row, col)
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, cell_border=2):
+        from PIL import Image
+
+        # Work out every cell's kind at once, then blow each one up into a
+        # cell_size block inside a border of cell_border pixels
+        kinds = self.cell_kinds(show_solution, show_explored)
+        cell_border = min(cell_border, (cell_size - 1) // 2)
+        inner = slice(cell_border, cell_size - cell_border + 1)
+        pixels = np.full((self.height, cell_size, self.width, cell_size), BORDER, dtype=np.uint8)
+        pixels[:, inner, :, inner] = kinds[:, None, :, None]
+
+        # Save as a paletted image, one byte per pixel; light compression
+        # costs a little file size but saves most of the encoding time
+        img = Image.fromarray(pixels.reshape(self.height * cell_size, self.width * cell_size), "P")
+        img.putpalette(COLORS.ravel().tolist())
+        img.save(filename, compress_level=1)
+
+
+def compare(filename):
+    """Solve a maze with every strategy and report how each fared."""
+    print(f"{'strategy':<10}{'explored':>10}{'length':>8}{'seconds':>10}")
+    for strategy in STRATEGIES:
+        m = Maze(filename)
+        m.solve(strategy)
+        print(f"{strategy:<10}{m.num_explored:>10}{len(m.solution[0]):>8}{m.solve_time:>10.4f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3) or (len(sys.argv) == 3 and sys.argv[2] not in STRATEGIES + ["all"]):
+        sys.exit(f"Usage: python maze.py maze.txt [{'|'.join(STRATEGIES)}|all]")
+
+    if len(sys.argv) == 3 and sys.argv[2] == "all":
+        compare(sys.argv[1])
+        sys.exit()
+
+    m = Maze(sys.argv[1])
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(sys.argv[2] if len(sys.argv) == 3 else "dfs")
+    print("States Explored:", m.num_explored)
+    print(f"Time: {m.solve_time:.4f}s")
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
@@ -0,0 +1,159 @@
+import sys
+from collections import OrderedDict
+
+from grid import GridMaze, descend
+
+# Most cells swept at once when batching, over all stacked copies of
+# the maze; each costs about 9 bytes while the sweep runs
+BATCH_CELLS = 1 << 24
+
+
+class MazeQueries():
+    """
+    Answers many (start, goal) questions about one maze layout.
+
+    The breadth-first distance field to each goal asked about is kept
+    in an LRU of at most capacity fields, so every later query towards
+    that goal is just a walk downhill from its start, taking time
+    proportional to the length of the path.
+    """
+
+    def __init__(self, walls, capacity=64):
+        self.grid = GridMaze(walls, None, None)
+        self.height = self.grid.height
+        self.width = self.grid.width
+        self.capacity = capacity
+        self.fields = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_file(cls, filename, capacity=64):
+        """
+        Load a layout in the text format of maze.py; any A and B
+        in it are treated as open cells.
+        """
+        return cls(GridMaze.from_file(filename, endpoints=False).walls, capacity)
+
+    def check(self, cell):
+        row, col = cell
+        if not (0 <= row < self.height and 0 <= col < self.width) or self.grid.walls[row, col]:
+            raise ValueError(f"{cell} is not an open cell")
+
+    def field(self, goals):
+        """
+        Returns the distance field to the nearest of a tuple of goals,
+        computing it on a miss.
+        """
+        field = self.fields.get(goals)
+        if field is not None:
+            self.fields.move_to_end(goals)
+            self.hits += 1
+            return field
+        self.misses += 1
+        for goal in goals:
+            self.check(goal)
+        return self.remember(goals, self.grid.distance_field(goals))
+
+    def remember(self, goals, field):
+        self.fields[goals] = field
+        self.fields.move_to_end(goals)
+        if len(self.fields) > self.capacity:
+            self.fields.popitem(last=False)
+        return field
+
+    def path(self, start, goal):
+        """
+        Returns a shortest (actions, cells) path from start to goal,
+        or None if goal cannot be reached.
+        """
+        self.check(start)
+        return descend(self.field((goal,)), start)
+
+    def nearest(self, start, goals):
+        """
+        Returns a shortest (actions, cells) path from start to whichever
+        of goals is closest, or None if none can be reached.
+        """
+        self.check(start)
+        return descend(self.field(tuple(sorted(goals))), start)
+
+    def distance(self, start, goal):
+        """
+        Returns the number of moves from start to goal, or None.
+        """
+        self.check(start)
+        distance = int(self.field((goal,))[start])
+        return distance if distance >= 0 else None
+
+    def batch(self, queries):
+        """
+        Returns a path (or None) for each (start, goal) pair in queries.
+        A query naming a wall or a cell outside the maze is answered
+        with its ValueError instead, without failing the others.
+
+        Fields for all goals not already cached are computed together in
+        one sweep, in groups no larger than the cache whose stacked
+        copies of the maze hold at most BATCH_CELLS cells.
+        """
+        paths = [None] * len(queries)
+        by_goal = OrderedDict()
+        for i, (start, goal) in enumerate(queries):
+            try:
+                self.check(start)
+                self.check(goal)
+            except ValueError as error:
+                paths[i] = error
+                continue
+            by_goal.setdefault(goal, []).append(i)
+
+        missing = []
+        for goal, indexes in by_goal.items():
+            if (goal,) not in self.fields:
+                missing.append(goal)
+                continue
+            field = self.field((goal,))
+            for i in indexes:
+                paths[i] = descend(field, queries[i][0])
+
+        # Answer each group's queries before the next group can evict it
+        cells = (self.height + 2) * (self.width + 2)
+        size = max(1, min(self.capacity, BATCH_CELLS // cells))
+        for g in range(0, len(missing), size):
+            group = missing[g:g + size]
+            for goal, field in zip(group, self.grid.distance_fields(group)):
+                # Copy, so the cache does not keep the whole stack alive
+                field = field.copy()
+                self.misses += 1
+                self.remember((goal,), field)
+                for i in by_goal[goal]:
+                    paths[i] = descend(field, queries[i][0])
+        return paths
+
+    def stats(self):
+        """
+        Returns hit and miss counters and the number of cached fields.
+        """
+        return {"hits": self.hits, "misses": self.misses, "fields": len(self.fields)}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python queries.py maze.txt queries.txt")
+
+    # Each line of queries.txt is "start_row start_col goal_row goal_col"
+    service = MazeQueries.from_file(sys.argv[1])
+    with open(sys.argv[2]) as f:
+        queries = []
+        for line in f:
+            if line.strip():
+                r1, c1, r2, c2 = (int(x) for x in line.split())
+                queries.append(((r1, c1), (r2, c2)))
+
+    for (start, goal), path in zip(queries, service.batch(queries)):
+        if isinstance(path, ValueError):
+            length = f"error: {path}"
+        else:
+            length = len(path[0]) if path is not None else "unreachable"
+        print(f"{start} -> {goal}: {length}")
+    print(service.stats())
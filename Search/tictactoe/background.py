@@ -0,0 +1,122 @@
+import threading
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Progress():
+    """
+    What a running search has reported so far. The search may update
+    nodes (positions searched) and best (the move it currently prefers)
+    as it goes, and should call check() now and then: it raises
+    Cancelled once nobody wants the answer any more.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.best = None
+        self.event = threading.Event()
+
+    def cancelled(self):
+        return self.event.is_set()
+
+    def check(self):
+        if self.event.is_set():
+            raise Cancelled()
+
+
+class MoveService():
+    """
+    Runs one AI move search at a time on a background thread, so a
+    game loop can keep drawing and handling events while it thinks.
+
+    start(search, *args) calls search(*args, progress) on the worker;
+    the loop then calls poll() each frame until the move is ready, and
+    can read progress meanwhile. cancel() abandons the current search,
+    whose answer is then thrown away, and waits for its thread to stop
+    so that two searches never share the same game state.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.progress = None
+        self.thread = None
+        self.done = False
+        self.move = None
+        self.error = None
+
+    def start(self, search, *args):
+        """
+        Cancel any running search and start a new one.
+        """
+        self.cancel()
+        progress = Progress()
+        thread = threading.Thread(target=self.run, args=(progress, search, args), daemon=True)
+        with self.lock:
+            self.progress = progress
+            self.thread = thread
+        thread.start()
+
+    def run(self, progress, search, args):
+        try:
+            move, error = search(*args, progress), None
+        except Cancelled:
+            return
+        except Exception as e:
+            move, error = None, e
+        with self.lock:
+            # Only the search still wanted may publish its answer
+            if progress is self.progress and not progress.cancelled():
+                self.move = move
+                self.error = error
+                self.done = True
+
+    def cancel(self):
+        """
+        Abandon the current search, if any, and wait for it to stop.
+        """
+        with self.lock:
+            if self.progress is not None:
+                self.progress.event.set()
+            thread = self.thread
+            self.progress = None
+            self.thread = None
+            self.done = False
+            self.move = None
+            self.error = None
+
+        # Searches check for cancellation often, so this is brief
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def busy(self):
+        """
+        Returns True while a search has been started and not yet collected.
+        """
+        return self.progress is not None
+
+    def poll(self):
+        """
+        Returns (True, move) once the current search has finished, and
+        forgets it; (False, None) while it runs or if there is none.
+        An exception raised by the search is raised here instead.
+        """
+        with self.lock:
+            if not self.done:
+                return False, None
+            move, error = self.move, self.error
+            self.progress = None
+            self.thread = None
+            self.done = False
+            self.move = None
+            self.error = None
+        if error is not None:
+            raise error
+        return True, move
+
+    def status(self):
+        """
+        Returns the current search's Progress, or None.
+        """
+        return self.progress
@@ -0,0 +1,237 @@
+# Tic-tac-toe positions as a pair of 9-bit masks (xs, os), one per
+# player, where cell (i, j) is bit 3 * i + j
+
+# Every cell filled
+FULL = (1 << 9) - 1
+
+# Bit of each cell and cell of each bit
+CELLS = [(i, j) for i in range(3) for j in range(3)]
+BITS = {cell: 1 << (3 * cell[0] + cell[1]) for cell in CELLS}
+
+# Rows, columns and diagonals
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+]
+
+# WINNING[mask] is true if the cells in mask complete a line, and
+# COUNT[mask] is the number of cells in mask
+WINNING = bytearray(
+    any(mask & line == line for line in WIN_MASKS) for mask in range(FULL + 1)
+)
+COUNT = bytearray(bin(mask).count("1") for mask in range(FULL + 1))
+
+# Cells tried first by the search: center, corners, then edges
+ORDER = [BITS[cell] for cell in [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2), (0, 1), (1, 0), (1, 2), (2, 1)]]
+
+
+def transform(cell_map):
+    """
+    Returns a table mapping every mask to its image when each cell
+    moves to cell_map(cell).
+    """
+    table = []
+    for mask in range(FULL + 1):
+        image = 0
+        for cell in CELLS:
+            if mask & BITS[cell]:
+                image |= BITS[cell_map(cell)]
+        table.append(image)
+    return table
+
+
+# The eight rotations and reflections of the board as mask tables
+SYMMETRIES = []
+for reflect in (False, True):
+    for turns in range(4):
+        def cell_map(cell, reflect=reflect, turns=turns):
+            i, j = (cell[0], 2 - cell[1]) if reflect else cell
+            for _ in range(turns):
+                i, j = j, 2 - i
+            return i, j
+        SYMMETRIES.append(transform(cell_map))
+
+# Transposition table kept across calls, mapping canonical positions
+# to (value, flag): the value is exact, a lower bound or an upper bound
+EXACT, LOWER, UPPER = range(3)
+table = {}
+
+# Positions searched and transposition table hits since the last reset
+stats = {"nodes": 0, "hits": 0}
+
+
+def x_to_move(xs, os):
+    """
+    Returns True if X has the next turn.
+    """
+    return COUNT[xs] == COUNT[os]
+
+
+def empty(xs, os):
+    """
+    Returns the mask of empty cells.
+    """
+    return FULL & ~(xs | os)
+
+
+def moves(xs, os):
+    """
+    Yields the bit of each empty cell.
+    """
+    free = FULL & ~(xs | os)
+    while free:
+        bit = free & -free
+        yield bit
+        free ^= bit
+
+
+def play(xs, os, bit):
+    """
+    Returns the position after the player to move takes cell bit.
+    """
+    if COUNT[xs] == COUNT[os]:
+        return xs | bit, os
+    return xs, os | bit
+
+
+def winner(xs, os):
+    """
+    Returns 1 if X has a line, -1 if O has, 0 otherwise.
+    """
+    if WINNING[xs]:
+        return 1
+    if WINNING[os]:
+        return -1
+    return 0
+
+
+def terminal(xs, os):
+    """
+    Returns True if the game is over.
+    """
+    return WINNING[xs] or WINNING[os] or (xs | os) == FULL
+
+
+def value(xs, os):
+    """
+    Returns the minimax value of a position: 1 if X wins with best
+    play, -1 if O does, 0 for a draw.
+    """
+    return alphabeta(xs, os, -2, 2)
+
+
+def alphabeta(xs, os, alpha, beta):
+    """
+    Returns the minimax value of a position if it lies strictly between
+    alpha and beta, otherwise a bound on it on the same side. Values
+    are kept in the transposition table under the canonical position.
+    """
+    if WINNING[xs]:
+        return 1
+    if WINNING[os]:
+        return -1
+    if (xs | os) == FULL:
+        return 0
+
+    stats["nodes"] += 1
+    key = canonical(xs, os)
+    entry = table.get(key)
+    if entry is not None:
+        stats["hits"] += 1
+        v, flag = entry
+        if flag == EXACT:
+            return v
+        elif flag == LOWER:
+            alpha = max(alpha, v)
+        else:
+            beta = min(beta, v)
+        if alpha >= beta:
+            return v
+
+    low, high = alpha, beta
+    if COUNT[xs] == COUNT[os]:
+        best = -2
+        for bit in ordered_moves(xs, os):
+            best = max(best, alphabeta(xs | bit, os, alpha, beta))
+            alpha = max(alpha, best)
+            if alpha >= beta:
+                break
+    else:
+        best = 2
+        for bit in ordered_moves(os, xs):
+            best = min(best, alphabeta(xs, os | bit, alpha, beta))
+            beta = min(beta, best)
+            if alpha >= beta:
+                break
+
+    # A value outside the window is only a bound
+    if best <= low:
+        table[key] = (best, UPPER)
+    elif best >= high:
+        table[key] = (best, LOWER)
+    else:
+        table[key] = (best, EXACT)
+    return best
+
+
+def ordered_moves(mine, theirs):
+    """
+    Returns the empty cells for the player holding mine, most promising
+    first: winning moves, then blocks, then center, corners and edges.
+    """
+    free = FULL & ~(mine | theirs)
+    wins = []
+    blocks = []
+    rest = []
+    for bit in ORDER:
+        if not free & bit:
+            continue
+        if WINNING[mine | bit]:
+            wins.append(bit)
+        elif WINNING[theirs | bit]:
+            blocks.append(bit)
+        else:
+            rest.append(bit)
+    return wins + blocks + rest
+
+
+def canonical(xs, os):
+    """
+    Returns a key shared by a position and its seven rotations and
+    reflections: the smallest of their packed 18-bit encodings.
+    """
+    return min((t[xs] << 9) | t[os] for t in SYMMETRIES)
+
+
+def best_move(xs, os):
+    """
+    Returns the bit of an optimal move for the player to move,
+    or None if the game is over.
+    """
+    if terminal(xs, os):
+        return None
+
+    # Each move only has to beat the best found so far
+    maximizing = COUNT[xs] == COUNT[os]
+    best_bit = None
+    best_value = -2 if maximizing else 2
+    for bit in ordered_moves(*((xs, os) if maximizing else (os, xs))):
+        if maximizing:
+            v = alphabeta(xs | bit, os, best_value, 2)
+            if v > best_value:
+                best_bit, best_value = bit, v
+        else:
+            v = alphabeta(xs, os | bit, -2, best_value)
+            if v < best_value:
+                best_bit, best_value = bit, v
+    return best_bit
+
+
+def reset():
+    """
+    Empties the transposition table and zeroes the counters.
+    """
+    table.clear()
+    stats["nodes"] = 0
+    stats["hits"] = 0
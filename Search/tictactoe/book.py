@@ -0,0 +1,112 @@
+import sys
+from os.path import abspath, dirname, join
+
+import bitboard
+
+# Default location of the generated book, next to this file
+BOOK_FILE = join(dirname(abspath(__file__)), "book.bin")
+
+# Number of positions a base-3 board index can name
+SIZE = 3 ** 9
+
+# Byte stored for positions that are unreachable or already over
+NO_MOVE = 0xFF
+
+# TERNARY[mask] is the base-3 number with a 1 in the digit of each
+# cell in mask, so a position's index is TERNARY[xs] + 2 * TERNARY[os]
+TERNARY = [
+    sum(3 ** i for i in range(9) if mask >> i & 1) for mask in range(bitboard.FULL + 1)
+]
+
+# The loaded book, or None until first use
+book = None
+
+
+def index(xs, os):
+    """
+    Returns the base-3 index of a position: digit i is 0 if cell bit i
+    is empty, 1 if X holds it and 2 if O does.
+    """
+    return TERNARY[xs] + 2 * TERNARY[os]
+
+
+def generate():
+    """
+    Returns the book as bytes: for each base-3 index, the cell number
+    (3 * i + j) of the best move from that position, or NO_MOVE.
+
+    Every reachable position is enumerated once, then solved backwards
+    from full boards to the empty one. Among moves with the best result
+    the book prefers the quickest win or the slowest loss.
+    """
+    # Reachable positions grouped by number of pieces on the board
+    levels = [{(0, 0)}]
+    for _ in range(9):
+        level = set()
+        for xs, os in levels[-1]:
+            if not bitboard.terminal(xs, os):
+                for bit in bitboard.moves(xs, os):
+                    level.add(bitboard.play(xs, os, bit))
+        levels.append(level)
+
+    # Solve each position as (value for X, moves until the game ends)
+    solved = {}
+    table = bytearray([NO_MOVE]) * SIZE
+    for level in reversed(levels):
+        for xs, os in level:
+            if bitboard.terminal(xs, os):
+                solved[(xs, os)] = (bitboard.winner(xs, os), 0)
+                continue
+
+            sign = 1 if bitboard.x_to_move(xs, os) else -1
+            best = None
+            for bit in bitboard.moves(xs, os):
+                value, plies = solved[bitboard.play(xs, os, bit)]
+                mine = value * sign
+                key = (mine, -plies if mine > 0 else plies)
+                if best is None or key > best[0]:
+                    best = (key, bit, value, plies)
+
+            _, bit, value, plies = best
+            solved[(xs, os)] = (value, plies + 1)
+            table[index(xs, os)] = bit.bit_length() - 1
+    return bytes(table)
+
+
+def save(filename=BOOK_FILE):
+    """
+    Generate the book and write it to filename.
+    """
+    with open(filename, "wb") as f:
+        f.write(generate())
+
+
+def load(filename=BOOK_FILE):
+    """
+    Returns the book stored in filename, generating it
+    in memory if the file is missing or malformed.
+    """
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except OSError:
+        data = b""
+    return data if len(data) == SIZE else generate()
+
+
+def lookup(xs, os):
+    """
+    Returns the bit of the book move for a position,
+    or None if the position is over or unreachable.
+    """
+    global book
+    if book is None:
+        book = load()
+    cell = book[TERNARY[xs] + 2 * TERNARY[os]]
+    return None if cell == NO_MOVE else 1 << cell
+
+
+if __name__ == "__main__":
+    filename = sys.argv[1] if len(sys.argv) > 1 else BOOK_FILE
+    save(filename)
+    print(f"Wrote {SIZE} entries to {filename}")
@@ -0,0 +1,245 @@
+import time
+
+# Score of a won position; wins found sooner score higher
+WIN = 10 ** 9
+
+# Nodes searched between checks of the clock
+CHECK_EVERY = 64
+
+# Boards with more cells than this only consider moves next to a stone
+NEARBY_AFTER = 25
+
+
+class Timeout(Exception):
+    pass
+
+
+class Game():
+    """
+    Rules and search for an m,n,k-game: players take turns claiming
+    cells of a rows x cols board and the first to hold k in a row,
+    column or diagonal wins. A position is a pair of bitmasks (xs, os)
+    over rows * cols bits, where cell (i, j) is bit i * cols + j.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.full = (1 << self.size) - 1
+
+        # Every run of k cells along a line, and the runs through each cell
+        self.windows = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + (k - 1) * di, j + (k - 1) * dj
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.windows.append(sum(
+                            1 << ((i + t * di) * cols + j + t * dj) for t in range(k)
+                        ))
+        self.through = [[w for w in self.windows if w >> index & 1] for index in range(self.size)]
+
+        # Cells nearest the center are tried first
+        center_i, center_j = (rows - 1) / 2, (cols - 1) / 2
+        self.order = sorted(
+            range(self.size),
+            key=lambda index: abs(index // cols - center_i) + abs(index % cols - center_j)
+        )
+
+        # Masks that stop shifted stones wrapping onto the next row
+        self.not_first = self.full
+        self.not_last = self.full
+        for i in range(rows):
+            self.not_first &= ~(1 << (i * cols))
+            self.not_last &= ~(1 << (i * cols + cols - 1))
+
+        # Open windows holding n of one player's stones score 4 ** n
+        self.weights = [4 ** n if n else 0 for n in range(k + 1)]
+
+        # Transposition table mapping (mover's stones, opponent's stones)
+        # to (depth, value, flag, best move), kept across searches
+        self.table = {}
+        self.nodes = 0
+        self.hits = 0
+        self.depth = 0
+        self.deadline = None
+        self.progress = None
+
+    def wins(self, stones, index):
+        """
+        Returns True if stones hold a full window through cell index,
+        the only place a line can have been completed by the last move.
+        """
+        for window in self.through[index]:
+            if stones & window == window:
+                return True
+        return False
+
+    def winner(self, xs, os):
+        """
+        Returns 1 if X holds a full window, -1 if O does, 0 otherwise.
+        """
+        for window in self.windows:
+            if xs & window == window:
+                return 1
+            if os & window == window:
+                return -1
+        return 0
+
+    def evaluate(self, mine, theirs):
+        """
+        Returns a heuristic score for the player holding mine: windows
+        only one side can still complete count for that side, more so
+        the more of its stones they already hold.
+        """
+        score = 0
+        weights = self.weights
+        for window in self.windows:
+            a = mine & window
+            b = theirs & window
+            if a and not b:
+                score += weights[bin(a).count("1")]
+            elif b and not a:
+                score -= weights[bin(b).count("1")]
+        return score
+
+    def candidates(self, mine, theirs, first=None):
+        """
+        Returns the cells worth trying, best guesses first: first (the
+        transposition table's move, if any), then nearest the center.
+        """
+        occupied = mine | theirs
+        free = self.full & ~occupied
+        if self.size > NEARBY_AFTER and occupied:
+            # Grow the stones by one cell in all eight directions
+            cols = self.cols
+            sideways = occupied | ((occupied << 1) & self.not_first) | ((occupied >> 1) & self.not_last)
+            free &= sideways | (sideways << cols) | (sideways >> cols)
+
+        moves = [index for index in self.order if free >> index & 1]
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def negamax(self, mine, theirs, depth, alpha, beta, ply):
+        """
+        Returns the value for the player to move, holding mine, of a
+        search depth moves deep, within the alpha-beta window.
+        """
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            self.check()
+
+        if (mine | theirs) == self.full:
+            return 0
+        if depth == 0:
+            return self.evaluate(mine, theirs)
+
+        key = (mine, theirs)
+        entry = self.table.get(key)
+        first = None
+        if entry is not None:
+            self.hits += 1
+            entry_depth, value, flag, first = entry
+            if entry_depth >= depth:
+                if flag == 0:
+                    return value
+                elif flag > 0:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        low = alpha
+        best = -WIN - 1
+        best_move = None
+        for index in self.candidates(mine, theirs, first):
+            stones = mine | (1 << index)
+            if self.wins(stones, index):
+                value = WIN - ply - 1
+            else:
+                value = -self.negamax(theirs, stones, depth - 1, -beta, -alpha, ply + 1)
+            if value > best:
+                best, best_move = value, index
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        # Flag 0 marks an exact value, 1 a lower and -1 an upper bound
+        flag = -1 if best <= low else 1 if best >= beta else 0
+        self.table[key] = (depth, best, flag, best_move)
+        return best
+
+    def check(self):
+        """
+        Stop the search if its time is up or it has been cancelled,
+        reporting progress first.
+        """
+        if self.progress is not None:
+            self.progress.nodes = self.nodes
+            if self.progress.cancelled():
+                raise Timeout()
+        if time.perf_counter() > self.deadline:
+            raise Timeout()
+
+    def search(self, xs, os, budget=1.0, max_depth=None, progress=None):
+        """
+        Returns (index, value) of the best move for the player to move,
+        deepening the search one move at a time until budget seconds
+        have passed, a result is certain or max_depth is reached. If
+        time runs out mid-search, the best move found so far is kept.
+        If progress is given, nodes searched and the best cell so far
+        are reported to it, and its cancellation ends the search early.
+        """
+        x_to_move = bin(xs).count("1") == bin(os).count("1")
+        mine, theirs = (xs, os) if x_to_move else (os, xs)
+        moves = self.candidates(mine, theirs)
+        if not moves:
+            return None, 0
+
+        self.deadline = time.perf_counter() + budget
+        self.progress = progress
+        self.nodes = 0
+        self.hits = 0
+        self.depth = 0
+        best_move, best_value = moves[0], 0
+
+        remaining = bin(self.full & ~(xs | os)).count("1")
+        limit = remaining if max_depth is None else min(max_depth, remaining)
+        for depth in range(1, limit + 1):
+            entry = self.table.get((mine, theirs))
+            moves = self.candidates(mine, theirs, entry[3] if entry is not None else None)
+            alpha = -WIN - 1
+            found = None
+            try:
+                for index in moves:
+                    stones = mine | (1 << index)
+                    if self.wins(stones, index):
+                        value = WIN - 1
+                    else:
+                        value = -self.negamax(theirs, stones, depth - 1, -WIN - 1, -alpha, 1)
+                    if value > alpha:
+                        alpha, found = value, index
+            except Timeout:
+                # The pass starts with the earlier best move, so any move
+                # that beat it before time ran out is better still
+                if found is not None and (found != moves[0] or self.depth == 0):
+                    best_move, best_value = found, alpha
+                break
+
+            best_move, best_value = found, alpha
+            self.depth = depth
+            if progress is not None:
+                progress.best = self.cell(best_move)
+            self.table[(mine, theirs)] = (depth, alpha, 0, found)
+            if abs(alpha) >= WIN - self.size:
+                break
+
+        return best_move, best_value
+
+    def cell(self, index):
+        return index // self.cols, index % self.cols
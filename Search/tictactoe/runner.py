@@ -3,6 +3,7 @@ import sys
 import time
 
 import tictactoe as ttt
+from background import MoveService
 
 pygame.init()
 size = width, height = 600, 400
@@ -21,6 +22,9 @@ user = None
 board = ttt.initial_state()
 ai_turn = False
 
+# The AI searches on a background thread so the window stays live
+service = MoveService()
+
 while True:
 
     for event in pygame.event.get():
@@ -103,6 +107,9 @@ while True:
             title = f"Play as {user}"
         else:
             title = f"Computer thinking..."
+            progress = service.status()
+            if progress is not None and progress.nodes:
+                title = f"Thinking: {progress.nodes:,} nodes, best {progress.best}"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
@@ -110,13 +117,14 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
+            if not ai_turn:
+                service.start(ttt.minimax, board)
                 ai_turn = True
+            else:
+                done, move = service.poll()
+                if done:
+                    board = ttt.result(board, move)
+                    ai_turn = False
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -139,6 +147,7 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
+                    service.cancel()
                     user = None
                     board = ttt.initial_state()
                     ai_turn = False
@@ -1,67 +1,80 @@
-import math
+import bitboard
+import book
+import mnk
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Board size and the number in a row needed to win; see configure()
+ROWS = 3
+COLS = 3
+K = 3
+
+# Seconds the AI may think on boards too big to solve outright
+BUDGET = 1.0
+
+# Engine for boards other than 3x3 with 3 in a row, which use bitboard
+game = None
+
+
+def configure(rows=3, cols=3, k=3, budget=1.0):
+    """
+    Play on a rows x cols board where k in a row wins, letting the AI
+    think for up to budget seconds a move when it cannot solve the game.
+    """
+    global ROWS, COLS, K, BUDGET, game
+    ROWS, COLS, K, BUDGET = rows, cols, k, budget
+    game = None if (rows, cols, k) == (3, 3, 3) else mnk.Game(rows, cols, k)
+
 
 def initial_state():
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * COLS for _ in range(ROWS)]
 
 
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    numx = sum(row.count(X) for row in board)
-    numo = sum(row.count(O) for row in board)
-    return X if numx == numo else O
+    xs, os = encode(board)
+    return X if bin(xs).count("1") == bin(os).count("1") else O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    moves = set()
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] == EMPTY:
-                moves.add((i, j))
-    return moves
+    xs, os = encode(board)
+    free = ~(xs | os)
+    return {(i, j) for i in range(ROWS) for j in range(COLS) if free >> (i * COLS + j) & 1}
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    if action not in actions(board):
+    xs, os = encode(board)
+    i, j = action
+    if not (0 <= i < ROWS and 0 <= j < COLS) or (xs | os) >> (i * COLS + j) & 1:
         raise Exception("Invalid move")
-    
-    new_board = [row[:] for row in board]  # Deep copy of the board
-    new_board[action[0]][action[1]] = player(board)
-    return new_board
+    bit = 1 << (i * COLS + j)
+    if player(board) == X:
+        return decode(xs | bit, os)
+    return decode(xs, os | bit)
 
 
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    for i in range(3):
-        # Check rows and columns
-        if board[i][0] == board[i][1] == board[i][2] != EMPTY:
-            return board[i][0]
-        if board[0][i] == board[1][i] == board[2][i] != EMPTY:
-            return board[0][i]
-    # Check diagonals
-    if board[0][0] == board[1][1] == board[2][2] != EMPTY:
-        return board[0][0]
-    if board[0][2] == board[1][1] == board[2][0] != EMPTY:
-        return board[0][2]
+    win = utility(board)
+    if win == 1:
+        return X
+    elif win == -1:
+        return O
     return None
 
 
@@ -69,77 +82,101 @@ def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) is not None:
-        return True
-    for row in board:
-        if EMPTY in row:
-            return False
-    return True
+    xs, os = encode(board)
+    return utility(board) != 0 or (xs | os) == (1 << (ROWS * COLS)) - 1
 
 
 def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    win = winner(board)
-    if win == X:
-        return 1
-    elif win == O:
-        return -1
-    else:
-        return 0
+    if game is None:
+        return bitboard.winner(*encode(board))
+    return game.winner(*encode(board))
 
 
-def minimax(board):
+def minimax(board, progress=None):
     """
-    Returns the optimal action for the current player on the board.
+    Returns the optimal action for the current player on the board;
+    on larger boards, the best found within the time budget. If given,
+    progress (a background.Progress) follows the search as it runs.
     """
     if terminal(board):
         return None
-
-    current_player = player(board)
-
-    if current_player == X:
-        best_value = -math.inf
-        best_move = None
-        for action in actions(board):
-            value = min_value(result(board, action))
-            if value > best_value:
-                best_value = value
-                best_move = action
-        return best_move
-    else:
-        best_value = math.inf
-        best_move = None
-        for action in actions(board):
-            value = max_value(result(board, action))
-            if value < best_value:
-                best_value = value
-                best_move = action
-        return best_move
+    if game is None:
+        # Standard boards are answered from the opening book, which
+        # only lacks positions that cannot arise in play
+        xs, os = encode(board)
+        bit = book.lookup(xs, os)
+        if bit is None:
+            bit = bitboard.best_move(xs, os)
+        action = bitboard.CELLS[bit.bit_length() - 1]
+        if progress is not None:
+            progress.best = action
+        return action
+    index, _ = game.search(*encode(board), BUDGET, progress=progress)
+    return game.cell(index)
 
 
 def max_value(board):
     """
     Returns the maximum utility value for the maximizer.
     """
-    if terminal(board):
-        return utility(board)
-
-    v = -math.inf
-    for action in actions(board):
-        v = max(v, min_value(result(board, action)))
-    return v
+    return value(board)
 
 
 def min_value(board):
     """
     Returns the minimum utility value for the minimizer.
     """
+    return value(board)
+
+
+def value(board):
+    """
+    Returns 1, -1 or 0 as X wins, O wins or neither with best play
+    (on larger boards, as far as the time budget can tell).
+    """
+    xs, os = encode(board)
+    if game is None:
+        return bitboard.value(xs, os)
     if terminal(board):
         return utility(board)
 
-    v = math.inf
-    for action in actions(board):
-        v = min(v, max_value(result(board, action)))
-    return v
+    # Search scores are for the player to move
+    _, score = game.search(xs, os, BUDGET)
+    sign = 1 if player(board) == X else -1
+    if score >= mnk.WIN - ROWS * COLS:
+        return sign
+    if score <= -mnk.WIN + ROWS * COLS:
+        return -sign
+    return 0
+
+
+def encode(board):
+    """
+    Returns the (xs, os) bitboards of a list board, where
+    cell (i, j) is bit i * COLS + j.
+    """
+    xs = os = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                xs |= 1 << (i * COLS + j)
+            elif cell == O:
+                os |= 1 << (i * COLS + j)
+    return xs, os
+
+
+def decode(xs, os):
+    """
+    Returns the list board of (xs, os) bitboards.
+    """
+    board = initial_state()
+    for i in range(ROWS):
+        for j in range(COLS):
+            if xs >> (i * COLS + j) & 1:
+                board[i][j] = X
+            elif os >> (i * COLS + j) & 1:
+                board[i][j] = O
+    return board
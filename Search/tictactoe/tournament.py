@@ -0,0 +1,181 @@
+import argparse
+import json
+import multiprocessing
+import random
+import time
+
+import bitboard
+import tictactoe as ttt
+
+# Agents that can take part, see choose()
+AGENTS = ["minimax", "search", "random"]
+
+
+def choose(agent, board, rng):
+    """
+    Returns (action, nodes, hits) for agent's move on board: the
+    positions it searched and how many were found in a cache.
+    """
+    if agent == "random":
+        return rng.choice(sorted(ttt.actions(board))), 0, 0
+
+    if agent == "minimax":
+        # The opening book answers 3x3 boards without searching, so
+        # only positions it lacks add to the bitboard counters
+        if ttt.game is None:
+            nodes, hits = bitboard.stats["nodes"], bitboard.stats["hits"]
+            action = ttt.minimax(board)
+            return action, bitboard.stats["nodes"] - nodes, bitboard.stats["hits"] - hits
+        action = ttt.minimax(board)
+        return action, ttt.game.nodes, ttt.game.hits
+
+    # Plain search, without the book
+    xs, os = ttt.encode(board)
+    if ttt.game is None:
+        nodes, hits = bitboard.stats["nodes"], bitboard.stats["hits"]
+        bit = bitboard.best_move(xs, os)
+        return (bitboard.CELLS[bit.bit_length() - 1],
+                bitboard.stats["nodes"] - nodes, bitboard.stats["hits"] - hits)
+    index, _ = ttt.game.search(xs, os, ttt.BUDGET)
+    return ttt.game.cell(index), ttt.game.nodes, ttt.game.hits
+
+
+def play_game(agents, openings, seed):
+    """
+    Play one game between agents (X's, O's), starting with openings
+    random moves. Returns the winner ("X", "O" or None) and a list of
+    (player, seconds, nodes, hits) for each move an agent chose.
+    """
+    rng = random.Random(seed)
+    board = ttt.initial_state()
+    moves = []
+    while not ttt.terminal(board):
+        player = ttt.player(board)
+        if len(moves) < openings:
+            action = rng.choice(sorted(ttt.actions(board)))
+            nodes = hits = 0
+            seconds = None
+        else:
+            agent = agents[0] if player == ttt.X else agents[1]
+            start = time.perf_counter()
+            action, nodes, hits = choose(agent, board, rng)
+            seconds = time.perf_counter() - start
+        moves.append((player, seconds, nodes, hits))
+        board = ttt.result(board, action)
+    return ttt.winner(board), [move for move in moves if move[1] is not None]
+
+
+def init_worker(rows, cols, k, budget):
+    """
+    Worker initializer: set up the board every game will use.
+    """
+    ttt.configure(rows, cols, k, budget)
+
+
+def play_games(task):
+    """
+    Worker entry point playing games for one (agents, openings, seeds) task.
+    """
+    agents, openings, seeds = task
+    return [play_game(agents, openings, seed) for seed in seeds]
+
+
+def percentiles(samples):
+    """
+    Returns summary statistics of a list of seconds, in milliseconds.
+    """
+    if not samples:
+        return {}
+    samples = sorted(samples)
+    pick = lambda p: samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+    return {
+        "mean": sum(samples) / len(samples) * 1000,
+        "p50": pick(0.5),
+        "p90": pick(0.9),
+        "p99": pick(0.99),
+        "max": samples[-1] * 1000
+    }
+
+
+def run(x, o, games=1000, workers=1, rows=3, cols=3, k=3, budget=1.0, openings=2, seed=0):
+    """
+    Play games between agent x (as X) and agent o (as O) across worker
+    processes and return a report of outcomes and per-move statistics.
+    """
+    seeds = [seed + i for i in range(games)]
+    chunk = max(1, games // (workers * 4))
+    tasks = [((x, o), openings, seeds[i:i + chunk]) for i in range(0, games, chunk)]
+
+    start = time.perf_counter()
+    if workers <= 1:
+        init_worker(rows, cols, k, budget)
+        results = [play_games(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(workers, initializer=init_worker,
+                                  initargs=(rows, cols, k, budget)) as pool:
+            results = pool.map(play_games, tasks)
+    seconds = time.perf_counter() - start
+
+    outcomes = {"X": 0, "O": 0, "draw": 0}
+    sides = {side: {"latencies": [], "nodes": 0, "hits": 0} for side in (ttt.X, ttt.O)}
+    for batch in results:
+        for winner, moves in batch:
+            outcomes[winner or "draw"] += 1
+            for player, latency, nodes, hits in moves:
+                sides[player]["latencies"].append(latency)
+                sides[player]["nodes"] += nodes
+                sides[player]["hits"] += hits
+
+    agents = {}
+    for side, agent in ((ttt.X, x), (ttt.O, o)):
+        stats = sides[side]
+        agents[side] = {
+            "agent": agent,
+            "moves": len(stats["latencies"]),
+            "latency_ms": percentiles(stats["latencies"]),
+            "nodes": stats["nodes"],
+            "hits": stats["hits"],
+            "hit_rate": stats["hits"] / stats["nodes"] if stats["nodes"] else None
+        }
+
+    return {
+        "game": "tictactoe",
+        "config": {"rows": rows, "cols": cols, "k": k, "budget": budget,
+                   "openings": openings, "seed": seed},
+        "games": games,
+        "workers": workers,
+        "seconds": seconds,
+        "outcomes": outcomes,
+        "agents": agents
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play tic-tac-toe agents against each other.")
+    parser.add_argument("--x", choices=AGENTS, default="minimax", help="agent playing X")
+    parser.add_argument("--o", choices=AGENTS, default="minimax", help="agent playing O")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("--k", type=int, default=3, help="number in a row needed to win")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="seconds per move on boards that cannot be solved")
+    parser.add_argument("--openings", type=int, default=2,
+                        help="random moves at the start of each game")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.x, args.o, args.games, args.workers, args.rows, args.cols,
+                 args.k, args.budget, args.openings, args.seed)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()